@@ -15,6 +15,7 @@ import HRIncidentTypes from './pages/hr/HRIncidentTypes';
 import HRAbsences from './pages/hr/HRAbsences';
 import HRIncidents from './pages/hr/HRIncidents';
 import HRGlobalCalendar from './pages/hr/HRGlobalCalendar';
+import HRCoverage from './pages/hr/HRCoverage';
 import HRHolidays from './pages/hr/HRHolidays';
 import HRScheduleTypes from './pages/hr/HRScheduleTypes';
 import HRClients from './pages/hr/HRClients';
@@ -23,6 +24,7 @@ import HRClientReports from './pages/hr/HRClientReports';
 import HRRequestsAdmin from './pages/hr/HRRequestsAdmin';
 import HRAnnualBalances from './pages/hr/HRAnnualBalances';
 import AdminDashboard from './pages/admin/AdminDashboard';
+import AdminQueryStats from './pages/admin/AdminQueryStats';
 import { useAuth } from './context/AuthContext';
 import ProtectedRoute from './components/auth/ProtectedRoute';
 import './App.css';
@@ -81,6 +83,7 @@ const AppRoutes = ({ isSidebarOpen, toggleSidebar }) => {
                         <Route path="incidents" element={<HRIncidents />} />
                         <Route path="incident-types" element={<HRIncidentTypes />} />
                         <Route path="calendar" element={<HRGlobalCalendar />} />
+                        <Route path="coverage" element={<HRCoverage />} />
                         <Route path="holidays" element={<HRHolidays />} />
                         <Route path="schedule-types" element={<HRScheduleTypes />} />
                         <Route path="clients" element={<HRClients />} />
@@ -93,6 +96,7 @@ const AppRoutes = ({ isSidebarOpen, toggleSidebar }) => {
                     {/* Super Admin Routes */}
                     <Route path="admin" element={<ProtectedRoute requiredRole="Super Admin" />}>
                         <Route path="dashboard" element={<AdminDashboard />} />
+                        <Route path="query-stats" element={<AdminQueryStats />} />
                     </Route>
                 </Route>
             </Route>
@@ -48,6 +48,7 @@ const Sidebar = ({ isSidebarOpen, toggleSidebar }) => {
 
                         <li className="menu-header">Calendario y Horarios</li>
                         <li><NavLink className={getNavLinkClass} to="/hr/calendar">Calendario Global</NavLink></li>
+                        <li><NavLink className={getNavLinkClass} to="/hr/coverage">Cobertura de Equipos</NavLink></li>
                         <li><NavLink className={getNavLinkClass} to="/hr/holidays">Días Festivos</NavLink></li>
                         <li><NavLink className={getNavLinkClass} to="/hr/schedule-types">Tipos de horario</NavLink></li>
 
@@ -66,6 +67,7 @@ const Sidebar = ({ isSidebarOpen, toggleSidebar }) => {
                     <>
                         <li className="menu-header">SUPER ADMIN</li>
                         <li><NavLink className={getNavLinkClass} to="/admin/dashboard">Gestión de Empresas</NavLink></li>
+                        <li><NavLink className={getNavLinkClass} to="/admin/query-stats">Rendimiento de Consultas</NavLink></li>
                     </>
                 )}
 
@@ -0,0 +1,27 @@
+import React, { useEffect, useState } from 'react';
+import { APP_UPDATE_EVENT } from '../serviceWorkerRegistration';
+import './UpdateBanner.css';
+
+// Shown when a new deploy is ready outside the kiosk, so a reload never interrupts a
+// half-filled form; the user decides when to switch to the new version.
+const UpdateBanner = () => {
+    const [applyUpdate, setApplyUpdate] = useState(null);
+
+    useEffect(() => {
+        const handleUpdate = (event) => setApplyUpdate(() => event.detail.applyUpdate);
+        window.addEventListener(APP_UPDATE_EVENT, handleUpdate);
+        return () => window.removeEventListener(APP_UPDATE_EVENT, handleUpdate);
+    }, []);
+
+    if (!applyUpdate) return null;
+
+    return (
+        <div className="update-banner" role="status">
+            <span>Nueva versión disponible.</span>
+            <button className="update-banner-reload" onClick={applyUpdate}>Actualizar</button>
+            <button className="update-banner-dismiss" onClick={() => setApplyUpdate(null)}>Más tarde</button>
+        </div>
+    );
+};
+
+export default UpdateBanner;
@@ -0,0 +1,22 @@
+import React from 'react';
+import './Pagination.css';
+
+const Pagination = ({ page, pageSize, totalCount, onPageChange }) => {
+    const totalPages = Math.max(1, Math.ceil(totalCount / pageSize));
+
+    return (
+        <div className="pagination">
+            <button onClick={() => onPageChange(page - 1)} disabled={page <= 0}>
+                Anterior
+            </button>
+            <span className="pagination-info">
+                Página {page + 1} de {totalPages} ({totalCount} registros)
+            </span>
+            <button onClick={() => onPageChange(page + 1)} disabled={page + 1 >= totalPages}>
+                Siguiente
+            </button>
+        </div>
+    );
+};
+
+export default Pagination;
@@ -12,10 +12,24 @@ const PinModal = ({ employee, onClose, onSuccess }) => {
         setError('');
 
         // Step 1: Verify the PIN.
-        // NOTE: In a real-world scenario, you would NOT fetch the PIN to the client.
-        // This check would be done in a secure backend function.
-        // For this prototype, we are checking against the PIN passed in the employee object.
-        if (employee.pin !== pin) {
+        // The kiosk employee list is cached offline without PINs, so the check is always
+        // a fresh query that only returns a row when the PIN matches.
+        // NOTE: In a real-world scenario this check would be done in a secure backend function.
+        const { data: match, error: pinError } = await supabase
+            .from('employees')
+            .select('id')
+            .eq('id', employee.id)
+            .eq('pin', pin)
+            .maybeSingle();
+
+        if (pinError) {
+            setError('No se pudo comprobar el PIN. Inténtalo de nuevo.');
+            console.error('Error verifying PIN:', pinError);
+            setLoading(false);
+            return;
+        }
+
+        if (!match) {
             setError('PIN incorrecto.');
             setLoading(false);
             return;
@@ -2,7 +2,9 @@ import React from 'react';
 import ReactDOM from 'react-dom/client';
 import './index.css';
 import App from './App';
+import UpdateBanner from './components/UpdateBanner';
 import reportWebVitals from './reportWebVitals';
+import * as serviceWorkerRegistration from './serviceWorkerRegistration';
 import { AuthProvider } from './context/AuthContext';
 
 const root = ReactDOM.createRoot(document.getElementById('root'));
@@ -10,10 +12,75 @@ root.render(
   <React.StrictMode>
     <AuthProvider>
       <App />
+      <UpdateBanner />
     </AuthProvider>
   </React.StrictMode>
 );
 
+// Precache the app shell so kiosks and phones start instantly and survive short outages.
+// Unattended kiosks switch to a new deploy as soon as it is installed; everywhere else the
+// user is offered the update, so open forms are never lost to a reload.
+const UPDATE_CHECK_INTERVAL_MS = 60 * 60 * 1000;
+const isKioskPage = () => window.location.pathname.startsWith('/kiosk');
+let reloadOnControllerChange = false;
+
+const offerUpdate = (applyUpdate) => {
+  window.dispatchEvent(new CustomEvent(serviceWorkerRegistration.APP_UPDATE_EVENT, { detail: { applyUpdate } }));
+};
+
+const activateUpdate = (registration) => {
+  reloadOnControllerChange = true;
+  if (registration.waiting) {
+    registration.waiting.postMessage({ type: 'SKIP_WAITING' });
+  } else {
+    window.location.reload();
+  }
+};
+
+serviceWorkerRegistration.register({
+  onUpdate: (registration) => {
+    if (isKioskPage()) {
+      activateUpdate(registration);
+    } else {
+      offerUpdate(() => activateUpdate(registration));
+    }
+  },
+});
+
+if ('serviceWorker' in navigator) {
+  // The first install also fires controllerchange (clientsClaim); only react to updates.
+  // Another tab (or a kiosk) may activate the new worker: reload only where this page
+  // asked for it, otherwise let the user pick the moment.
+  let hasController = Boolean(navigator.serviceWorker.controller);
+  let refreshing = false;
+  navigator.serviceWorker.addEventListener('controllerchange', () => {
+    if (refreshing) return;
+    if (reloadOnControllerChange) {
+      refreshing = true;
+      window.location.reload();
+      return;
+    }
+    if (!hasController) {
+      hasController = true;
+      return;
+    }
+    if (isKioskPage()) {
+      refreshing = true;
+      window.location.reload();
+    } else {
+      offerUpdate(() => window.location.reload());
+    }
+  });
+
+  // Browsers only look for a new worker on navigation, and a kiosk never navigates.
+  // Check for a deploy periodically so long-running pages still pick it up.
+  navigator.serviceWorker.ready.then((registration) => {
+    setInterval(() => {
+      registration.update().catch((error) => console.error('Error checking for updates:', error));
+    }, UPDATE_CHECK_INTERVAL_MS);
+  });
+}
+
 // If you want to start measuring performance in your app, pass a function
 // to log results (for example: reportWebVitals(console.log))
 // or send to an analytics endpoint. Learn more: https://bit.ly/CRA-vitals
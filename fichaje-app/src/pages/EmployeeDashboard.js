@@ -20,12 +20,13 @@ const StatCard = ({ title, value, unit }) => (
     </div>
 );
 
-// Helper function to calculate the difference in days between two dates
-const calculateDaysBetween = (startDate, endDate) => {
-    const start = new Date(startDate);
-    const end = new Date(endDate);
-    const differenceInTime = end.getTime() - start.getTime();
-    return Math.round(differenceInTime / (1000 * 3600 * 24)) + 1;
+// Derives the clocking status from today's entries, sorted chronologically
+const getClockingStatus = (entries) => {
+    if (!entries || entries.length === 0) return 'Fuera de servicio';
+    const lastAction = entries[entries.length - 1].action;
+    if (lastAction === 'Entrada' || lastAction === 'Reanudar') return 'Trabajando';
+    if (lastAction === 'Pausa') return 'En Pausa';
+    return 'Fuera de servicio';
 };
 
 
@@ -41,71 +42,37 @@ const EmployeeDashboard = () => {
 
     const [usedVacationDays, setUsedVacationDays] = useState(0);
     const [remainingVacationDays, setRemainingVacationDays] = useState(0);
-    const [timeWorkedToday, setTimeWorkedToday] = useState(0);
+    const [todayEntries, setTodayEntries] = useState([]);
     const [loadingVacations, setLoadingVacations] = useState(true);
-    const [clockingStatus, setClockingStatus] = useState('Fuera de servicio');
 
 
     useEffect(() => {
         const timer = setInterval(() => setCurrentTime(new Date()), 1000);
 
+        // Loads schedule, vacation usage, today's entries and clients in a single RPC
         const fetchInitialData = async () => {
             if (!user?.id || !companyId) return;
 
             setLoading(true);
             setLoadingVacations(true);
 
-            // Fetch user's schedule
-            const { data: scheduleData, error: scheduleError } = await supabase
-                .from('employees')
-                .select('schedule:schedules (name, schedule_type, hours_per_week)')
-                .eq('id', user.id)
-                .single();
-            if (scheduleError) console.error("Error fetching user's schedule:", scheduleError);
-            else if (scheduleData && scheduleData.schedule) setSchedule(scheduleData.schedule);
-
-            // Fetch approved vacation requests
-            const { data: requestsData, error: requestsError } = await supabase
-                .from('requests')
-                .select('start_date, end_date')
-                .eq('employee_id', user.id)
-                .eq('request_type', 'Vacaciones')
-                .eq('status', 'Aprobada')
-                .eq('company_id', companyId);
-
-            if (requestsError) console.error("Error fetching vacation requests:", requestsError);
-            else {
-                const totalDaysUsed = requestsData.reduce((acc, req) => acc + calculateDaysBetween(req.start_date, req.end_date), 0);
-                setUsedVacationDays(totalDaysUsed);
-            }
-            setLoadingVacations(false);
-
-            // Fetch all time entries for today
             const today = new Date();
             today.setHours(0, 0, 0, 0);
-            const { data: todayEntries, error: entriesError } = await supabase
-                .from('time_entries')
-                .select('*')
-                .eq('employee_id', user.id)
-                .eq('company_id', companyId)
-                .gte('created_at', today.toISOString())
-                .order('created_at', { ascending: true });
-
-            if (entriesError) {
-                console.error("Error fetching today's time entries:", entriesError);
-            } else if (todayEntries && todayEntries.length > 0) {
-                const lastAction = todayEntries[todayEntries.length - 1].action;
-                if (lastAction === 'Entrada' || lastAction === 'Reanudar') {
-                    setClockingStatus('Trabajando');
-                } else if (lastAction === 'Pausa') {
-                    setClockingStatus('En Pausa');
-                } else {
-                    setClockingStatus('Fuera de servicio');
-                }
-                const workedHours = calculateActualWorkedHours(todayEntries);
-                setTimeWorkedToday(workedHours);
+            const { data: home, error: homeError } = await supabase.rpc('employee_home', {
+                p_employee_id: user.id,
+                p_since: today.toISOString(),
+            });
+
+            if (homeError) {
+                console.error('Error fetching dashboard data:', homeError);
+            } else if (home) {
+                setSchedule(home.schedule);
+                setUsedVacationDays(home.used_vacation_days);
+                setTodayEntries(home.today_entries);
+                setClients(home.clients);
             }
 
+            setLoadingVacations(false);
             setLoading(false);
         };
 
@@ -113,17 +80,6 @@ const EmployeeDashboard = () => {
         return () => clearInterval(timer);
     }, [user?.id, companyId]);
 
-    useEffect(() => {
-        const fetchClients = async () => {
-            if (!companyId || !settings?.has_clients_module) return;
-            const { data, error } = await supabase
-                .from('clients').select('id, name').eq('company_id', companyId).order('name', { ascending: true });
-            if (error) console.error('Error fetching clients:', error);
-            else setClients(data);
-        };
-        fetchClients();
-    }, [companyId, settings?.has_clients_module]);
-
     useEffect(() => {
         if (user?.vacation_days) {
             setRemainingVacationDays(user.vacation_days - usedVacationDays);
@@ -141,34 +97,15 @@ const EmployeeDashboard = () => {
             company_id: companyId,
         };
         try {
-            const { error: insertError } = await supabase.from('time_entries').insert([entry]);
-            if (insertError) throw insertError;
-
-            // Refetch today's entries to update status and worked time
-            const today = new Date();
-            today.setHours(0, 0, 0, 0);
-            const { data: todayEntries, error: entriesError } = await supabase
+            const { data: newEntry, error: insertError } = await supabase
                 .from('time_entries')
-                .select('*')
-                .eq('employee_id', user.id)
-                .eq('company_id', companyId)
-                .gte('created_at', today.toISOString())
-                .order('created_at', { ascending: true });
-
-            if (entriesError) {
-                console.error("Error refetching today's entries:", entriesError);
-            } else if (todayEntries && todayEntries.length > 0) {
-                const lastAction = todayEntries[todayEntries.length - 1].action;
-                if (lastAction === 'Entrada' || lastAction === 'Reanudar') setClockingStatus('Trabajando');
-                else if (lastAction === 'Pausa') setClockingStatus('En Pausa');
-                else setClockingStatus('Fuera de servicio');
-                const workedHours = calculateActualWorkedHours(todayEntries);
-                setTimeWorkedToday(workedHours);
-            } else {
-                setClockingStatus('Fuera de servicio');
-                setTimeWorkedToday(0);
-            }
+                .insert([entry])
+                .select('action, created_at')
+                .single();
+            if (insertError) throw insertError;
 
+            // Append the stored entry instead of refetching today's entries
+            setTodayEntries(currentEntries => [...currentEntries, newEntry]);
             setLastClocking({ type: actionType, time: new Date(), client: entry.client_name });
         } catch (err) {
             setError('Error al guardar el fichaje. Inténtalo de nuevo.');
@@ -177,6 +114,8 @@ const EmployeeDashboard = () => {
         }
     };
 
+    const clockingStatus = getClockingStatus(todayEntries);
+    const timeWorkedToday = calculateActualWorkedHours(todayEntries);
     const isClockedOut = clockingStatus === 'Fuera de servicio';
     const isWorking = clockingStatus === 'Trabajando';
     const isOnBreak = clockingStatus === 'En Pausa';
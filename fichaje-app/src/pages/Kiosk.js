@@ -45,10 +45,11 @@ const Kiosk = () => {
             const companyId = companyData.id;
             setCompanyDisplayName(companyData.name);
 
-            // 2. Fetch employees for that company
+            // 2. Fetch employees for that company. The service worker caches this list,
+            // so it must never include PINs; PinModal checks the PIN against the server.
             const { data, error: employeesError } = await supabase
                 .from('employees')
-                .select('*')
+                .select('id, full_name, avatar_url')
                 .eq('role', 'Empleado')
                 .eq('company_id', companyId)
                 .order('full_name', { ascending: true });
@@ -3,6 +3,9 @@ import { useAuth } from '../context/AuthContext';
 import { supabase } from '../supabaseClient';
 import './Requests.css';
 
+// Request types that do not take the employee away from work.
+const NON_ABSENCE_TYPES = ['Error en el fichaje', 'Solicitud cambio de horario'];
+
 const Requests = () => {
     const { user, companyId } = useAuth();
     const [requestType, setRequestType] = useState('');
@@ -52,12 +55,40 @@ const Requests = () => {
         } else if (requestType !== '' && (!startDate || !endDate)) {
             setError('Las fechas de inicio y fin son obligatorias.');
             return;
+        } else if (endDate < startDate) {
+            setError('La fecha de fin no puede ser anterior a la fecha de inicio.');
+            return;
         }
 
         setLoading(true);
         setError('');
         setSuccess('');
 
+        if (!NON_ABSENCE_TYPES.includes(requestType)) {
+            const { data: overlapData, error: overlapError } = await supabase.rpc('request_overlap', {
+                p_start_date: startDate,
+                p_end_date: endDate,
+            });
+
+            if (overlapError) {
+                // The check is advisory; a failure here should not block the request.
+                console.error('Error checking request overlap:', overlapError);
+            } else if (overlapData && overlapData.length > 0) {
+                const overlap = overlapData[0];
+                if (overlap.own_overlaps > 0) {
+                    setError('Ya tienes una solicitud pendiente o aprobada que coincide con esas fechas.');
+                    setLoading(false);
+                    return;
+                }
+                if (overlap.colleagues_absent > 0 && !window.confirm(
+                    `${overlap.colleagues_absent} de ${overlap.department_headcount} personas de tu departamento ya tienen una ausencia aprobada en esas fechas. ¿Quieres enviar la solicitud igualmente?`
+                )) {
+                    setLoading(false);
+                    return;
+                }
+            }
+        }
+
         let attachmentUrl = null;
 
         if (requestType === 'Baja Médica' && attachment) {
@@ -1,7 +1,18 @@
 import React, { useState, useEffect } from 'react';
 import { supabase } from '../../supabaseClient';
+import Pagination from '../../components/hr/Pagination';
 import './AdminDashboard.css';
 
+const PAGE_SIZE = 25;
+
+// Helper to format a byte count into a human readable size
+const formatBytes = (bytes) => {
+    if (!bytes) return '0 B';
+    const units = ['B', 'KB', 'MB', 'GB', 'TB'];
+    const exponent = Math.min(Math.floor(Math.log(bytes) / Math.log(1024)), units.length - 1);
+    return `${(bytes / Math.pow(1024, exponent)).toFixed(exponent === 0 ? 0 : 1)} ${units[exponent]}`;
+};
+
 const CompanyForm = ({ company, onSave, onCancel, isSaving }) => {
     const [name, setName] = useState(company ? company.name : '');
 
@@ -80,18 +91,36 @@ const AdminDashboard = () => {
     const [editingCompany, setEditingCompany] = useState(null);
     const [targetCompanyId, setTargetCompanyId] = useState(null);
     const [isSaving, setIsSaving] = useState(false);
+    const [page, setPage] = useState(0);
+    const [totalCount, setTotalCount] = useState(0);
+    const [searchInput, setSearchInput] = useState('');
+    const [searchTerm, setSearchTerm] = useState('');
+    const [sort, setSort] = useState({ column: 'name', ascending: true });
+    const [isRefreshingStats, setIsRefreshingStats] = useState(false);
 
     const fetchCompanies = async () => {
         setLoading(true);
         setError('');
         try {
-            const { data, error } = await supabase
-                .from('companies')
-                .select('*')
-                .order('name', { ascending: true });
+            const from = page * PAGE_SIZE;
+            let query = supabase
+                .from('company_overview')
+                .select('*', { count: 'exact' })
+                .order(sort.column, { ascending: sort.ascending, nullsFirst: false })
+                .order('id', { ascending: true })
+                .range(from, from + PAGE_SIZE - 1);
+
+            if (searchTerm) {
+                // Match the text literally: escape the LIKE wildcards and the escape character.
+                const pattern = searchTerm.replace(/[\\%_]/g, '\\$&');
+                query = query.ilike('name', `%${pattern}%`);
+            }
+
+            const { data, count, error } = await query;
 
             if (error) throw error;
             setCompanies(data || []);
+            setTotalCount(count || 0);
         } catch (err) {
             setError('No se pudieron cargar las empresas.');
             console.error(err);
@@ -102,7 +131,49 @@ const AdminDashboard = () => {
 
     useEffect(() => {
         fetchCompanies();
-    }, []);
+    }, [page, searchTerm, sort]);
+
+    // Debounce the search box so typing does not fire a query per keystroke
+    useEffect(() => {
+        const timeout = setTimeout(() => {
+            setSearchTerm(searchInput.trim());
+            setPage(0);
+        }, 300);
+        return () => clearTimeout(timeout);
+    }, [searchInput]);
+
+    const handleRefreshStats = async () => {
+        setIsRefreshingStats(true);
+        setError('');
+        const { error } = await supabase.rpc('refresh_company_stats');
+        if (error) {
+            setError(`Error al actualizar las estadísticas: ${error.message}`);
+        } else {
+            fetchCompanies();
+        }
+        setIsRefreshingStats(false);
+    };
+
+    // Companies created after the last refresh have no statistics yet, so use the latest
+    // refresh time on the page rather than the first row's.
+    const statsRefreshedAt = companies.reduce(
+        (latest, company) => (company.refreshed_at && (!latest || company.refreshed_at > latest) ? company.refreshed_at : latest),
+        null
+    );
+
+    const handleSort = (column) => {
+        setSort(currentSort => ({
+            column,
+            ascending: currentSort.column === column ? !currentSort.ascending : column === 'name',
+        }));
+        setPage(0);
+    };
+
+    const renderSortableHeader = (column, label) => (
+        <th className="sortable-header" onClick={() => handleSort(column)}>
+            {label} {sort.column === column ? (sort.ascending ? '▲' : '▼') : ''}
+        </th>
+    );
 
     const handleToggleModule = async (company) => {
         try {
@@ -200,6 +271,23 @@ const AdminDashboard = () => {
             </div>
 
             <div className="panel-section">
+                <div className="admin-toolbar">
+                    <input
+                        type="search"
+                        placeholder="Buscar empresa..."
+                        value={searchInput}
+                        onChange={(e) => setSearchInput(e.target.value)}
+                    />
+                    <span className="stats-refreshed">
+                        {statsRefreshedAt
+                            ? `Estadísticas actualizadas: ${new Date(statsRefreshedAt).toLocaleString()}`
+                            : 'Estadísticas sin calcular'}
+                        <button onClick={handleRefreshStats} className="action-btn save-btn" disabled={isRefreshingStats}>
+                            {isRefreshingStats ? 'Actualizando...' : 'Actualizar ahora'}
+                        </button>
+                    </span>
+                </div>
+
                 {loading && <p>Cargando empresas...</p>}
                 {error && <p className="error-message">{error}</p>}
 
@@ -209,9 +297,13 @@ const AdminDashboard = () => {
                             <thead>
                                 <tr>
                                     <th>ID</th>
-                                    <th>Nombre de la Empresa</th>
+                                    {renderSortableHeader('name', 'Nombre de la Empresa')}
                                     <th>Módulo Clientes</th>
-                                    <th>Fecha de Creación</th>
+                                    {renderSortableHeader('employee_count', 'Empleados')}
+                                    {renderSortableHeader('time_entries_per_day', 'Fichajes/día (30d)')}
+                                    {renderSortableHeader('storage_bytes', 'Almacenamiento')}
+                                    {renderSortableHeader('last_activity_at', 'Última Actividad')}
+                                    {renderSortableHeader('created_at', 'Fecha de Creación')}
                                     <th>Acciones</th>
                                 </tr>
                             </thead>
@@ -225,6 +317,10 @@ const AdminDashboard = () => {
                                                 {company.has_clients_module ? 'Activado' : 'Desactivado'}
                                             </span>
                                         </td>
+                                        <td>{company.employee_count}</td>
+                                        <td>{company.time_entries_per_day}</td>
+                                        <td>{formatBytes(company.storage_bytes)}</td>
+                                        <td>{company.last_activity_at ? new Date(company.last_activity_at).toLocaleString() : 'Sin actividad'}</td>
                                         <td>{new Date(company.created_at).toLocaleDateString()}</td>
                                         <td className="actions-cell">
                                             <button onClick={() => handleToggleModule(company)} className="action-btn">
@@ -237,6 +333,7 @@ const AdminDashboard = () => {
                                 ))}
                             </tbody>
                         </table>
+                        <Pagination page={page} pageSize={PAGE_SIZE} totalCount={totalCount} onPageChange={setPage} />
                     </div>
                 )}
             </div>
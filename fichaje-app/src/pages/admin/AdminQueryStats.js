@@ -0,0 +1,182 @@
+import React, { useState, useEffect } from 'react';
+import { supabase } from '../../supabaseClient';
+import './AdminDashboard.css';
+import './AdminQueryStats.css';
+
+const ORDER_OPTIONS = [
+    { value: 'total', label: 'Tiempo total' },
+    { value: 'mean', label: 'Tiempo medio' },
+    { value: 'rows', label: 'Filas' },
+    { value: 'calls', label: 'Llamadas' },
+];
+
+// Helper to format milliseconds with a sensible precision
+const formatMs = (ms) => {
+    if (ms === null || ms === undefined) return '-';
+    if (ms >= 1000) return `${(ms / 1000).toFixed(2)} s`;
+    return `${ms.toFixed(2)} ms`;
+};
+
+const AdminQueryStats = () => {
+    const [queries, setQueries] = useState([]);
+    const [snapshots, setSnapshots] = useState([]);
+    const [orderBy, setOrderBy] = useState('total');
+    const [fromSnapshot, setFromSnapshot] = useState('');
+    const [toSnapshot, setToSnapshot] = useState('');
+    const [snapshotLabel, setSnapshotLabel] = useState('');
+    const [loading, setLoading] = useState(true);
+    const [isSaving, setIsSaving] = useState(false);
+    const [error, setError] = useState('');
+
+    const fetchSnapshots = async () => {
+        const { data, error } = await supabase
+            .from('query_stats_snapshots')
+            .select('id, label, created_at')
+            .order('created_at', { ascending: false });
+
+        if (error) {
+            console.error('Error fetching snapshots:', error);
+        } else {
+            setSnapshots(data);
+        }
+    };
+
+    const fetchQueries = async () => {
+        setLoading(true);
+        setError('');
+
+        // Without a base snapshot show cumulative statistics; otherwise the work done since it.
+        const { data, error } = fromSnapshot
+            ? await supabase.rpc('query_stats_diff', {
+                p_from_snapshot: Number(fromSnapshot),
+                p_to_snapshot: toSnapshot ? Number(toSnapshot) : null,
+                p_order_by: orderBy,
+                p_limit: 50,
+            })
+            : await supabase.rpc('top_queries', { p_order_by: orderBy, p_limit: 50 });
+
+        if (error) {
+            console.error('Error fetching query stats:', error);
+            setError('No se pudieron cargar las estadísticas de consultas.');
+            setQueries([]);
+        } else {
+            setQueries(data);
+        }
+        setLoading(false);
+    };
+
+    useEffect(() => {
+        fetchSnapshots();
+    }, []);
+
+    useEffect(() => {
+        fetchQueries();
+    }, [orderBy, fromSnapshot, toSnapshot]);
+
+    const handleCreateSnapshot = async (e) => {
+        e.preventDefault();
+        setIsSaving(true);
+        setError('');
+
+        const { error } = await supabase.rpc('create_query_stats_snapshot', { p_label: snapshotLabel });
+
+        if (error) {
+            setError(`Error al crear el snapshot: ${error.message}`);
+        } else {
+            setSnapshotLabel('');
+            fetchSnapshots();
+        }
+        setIsSaving(false);
+    };
+
+    const snapshotOption = (snapshot) => (
+        <option key={snapshot.id} value={snapshot.id}>
+            {snapshot.label} ({new Date(snapshot.created_at).toLocaleString()})
+        </option>
+    );
+
+    return (
+        <div className="admin-dashboard-container">
+            <div className="hr-panel-header">
+                <h1>Rendimiento de Consultas</h1>
+            </div>
+
+            <div className="panel-section">
+                <form className="admin-toolbar" onSubmit={handleCreateSnapshot}>
+                    <input
+                        type="text"
+                        placeholder="Nombre del snapshot (ej: antes del despliegue)"
+                        value={snapshotLabel}
+                        onChange={(e) => setSnapshotLabel(e.target.value)}
+                        required
+                        disabled={isSaving}
+                    />
+                    <button type="submit" className="action-btn save-btn" disabled={isSaving}>
+                        {isSaving ? 'Guardando...' : 'Crear Snapshot'}
+                    </button>
+                </form>
+
+                <div className="query-stats-filters">
+                    <label>
+                        Ordenar por:
+                        <select value={orderBy} onChange={(e) => setOrderBy(e.target.value)}>
+                            {ORDER_OPTIONS.map(option => (
+                                <option key={option.value} value={option.value}>{option.label}</option>
+                            ))}
+                        </select>
+                    </label>
+                    <label>
+                        Comparar desde:
+                        <select value={fromSnapshot} onChange={(e) => { setFromSnapshot(e.target.value); setToSnapshot(''); }}>
+                            <option value="">-- Estadísticas acumuladas --</option>
+                            {snapshots.map(snapshotOption)}
+                        </select>
+                    </label>
+                    {fromSnapshot && (
+                        <label>
+                            Hasta:
+                            <select value={toSnapshot} onChange={(e) => setToSnapshot(e.target.value)}>
+                                <option value="">Ahora</option>
+                                {snapshots.filter(s => String(s.id) !== fromSnapshot).map(snapshotOption)}
+                            </select>
+                        </label>
+                    )}
+                </div>
+
+                {loading && <p>Cargando estadísticas...</p>}
+                {error && <p className="error-message">{error}</p>}
+
+                {!loading && !error && (
+                    <div className="table-container">
+                        <table className="hr-panel-table">
+                            <thead>
+                                <tr>
+                                    <th>Consulta</th>
+                                    <th>Llamadas</th>
+                                    <th>Tiempo Total</th>
+                                    <th>Tiempo Medio</th>
+                                    <th>Filas</th>
+                                </tr>
+                            </thead>
+                            <tbody>
+                                {queries.length > 0 ? queries.map(q => (
+                                    <tr key={q.queryid}>
+                                        <td className="query-text" title={q.query}>{q.query}</td>
+                                        <td>{q.calls}</td>
+                                        <td>{formatMs(q.total_exec_time)}</td>
+                                        <td>{formatMs(q.mean_exec_time)}</td>
+                                        <td>{q.rows}</td>
+                                    </tr>
+                                )) : (
+                                    <tr><td colSpan="5">No hay consultas registradas.</td></tr>
+                                )}
+                            </tbody>
+                        </table>
+                    </div>
+                )}
+            </div>
+        </div>
+    );
+};
+
+export default AdminQueryStats;
@@ -0,0 +1,140 @@
+import React, { useState, useEffect } from 'react';
+import { supabase } from '../../supabaseClient';
+import { useAuth } from '../../context/AuthContext';
+import { getDaysInMonth } from '../../utils/calendar';
+import './HRPanel.css';
+import './HRGlobalCalendar.css';
+import './HRCoverage.css';
+
+const toDateString = (year, month, day) =>
+    `${year}-${String(month + 1).padStart(2, '0')}-${String(day).padStart(2, '0')}`;
+
+// Maps the share of a department that is absent to one of five heatmap levels.
+const getCoverageLevel = (absent, headcount) => {
+    if (!absent || !headcount) return 0;
+    const ratio = absent / headcount;
+    if (ratio < 0.15) return 1;
+    if (ratio < 0.3) return 2;
+    if (ratio < 0.5) return 3;
+    return 4;
+};
+
+const HRCoverage = () => {
+    const { companyId } = useAuth();
+    const [currentDate, setCurrentDate] = useState(new Date());
+    const [departments, setDepartments] = useState([]);
+    const [loading, setLoading] = useState(true);
+    const [error, setError] = useState(null);
+
+    const year = currentDate.getFullYear();
+    const month = currentDate.getMonth();
+    const daysInMonth = getDaysInMonth(year, month);
+
+    useEffect(() => {
+        if (!companyId) return;
+
+        const fetchCoverage = async () => {
+            setLoading(true);
+            setError(null);
+
+            const { data, error: rpcError } = await supabase.rpc('department_coverage', {
+                p_company_id: companyId,
+                p_start_date: toDateString(year, month, 1),
+                p_end_date: toDateString(year, month, daysInMonth),
+            });
+
+            if (rpcError) {
+                console.error('Error fetching coverage:', rpcError);
+                setError('No se pudo cargar la cobertura de los equipos.');
+                setDepartments([]);
+            } else {
+                // Group the flat (department, day) rows into one heatmap row per department.
+                const byDepartment = new Map();
+                data.forEach(row => {
+                    const key = row.department_id ?? 'none';
+                    if (!byDepartment.has(key)) {
+                        byDepartment.set(key, { key, name: row.department_name, headcount: row.headcount, days: {} });
+                    }
+                    byDepartment.get(key).days[row.day] = { absent: row.absent, pending: row.pending };
+                });
+                setDepartments(Array.from(byDepartment.values()));
+            }
+            setLoading(false);
+        };
+        fetchCoverage();
+    }, [companyId, year, month, daysInMonth]);
+
+    const handlePrevMonth = () => {
+        setCurrentDate(new Date(year, month - 1, 1));
+    };
+
+    const handleNextMonth = () => {
+        setCurrentDate(new Date(year, month + 1, 1));
+    };
+
+    const monthName = currentDate.toLocaleString('es-ES', { month: 'long' });
+    const dayNumbers = Array.from({ length: daysInMonth }, (_, i) => i + 1);
+
+    return (
+        <div className="hr-panel-container">
+            <div className="hr-panel-header">
+                <h1>Cobertura de Equipos</h1>
+            </div>
+
+            <div className="coverage-legend">
+                <span className="coverage-cell coverage-level-0">0%</span>
+                <span className="coverage-cell coverage-level-1">&lt;15%</span>
+                <span className="coverage-cell coverage-level-2">&lt;30%</span>
+                <span className="coverage-cell coverage-level-3">&lt;50%</span>
+                <span className="coverage-cell coverage-level-4">50%+</span>
+                <span>Porcentaje del departamento ausente (ausencias aprobadas)</span>
+            </div>
+
+            <div className="calendar-header">
+                <button onClick={handlePrevMonth}>&lt;</button>
+                <h2>{monthName.charAt(0).toUpperCase() + monthName.slice(1)} {year}</h2>
+                <button onClick={handleNextMonth}>&gt;</button>
+            </div>
+
+            {loading && <p>Cargando cobertura...</p>}
+            {error && <p className="error-message">{error}</p>}
+
+            {!loading && !error && (
+                <div className="coverage-table-container">
+                    <table className="coverage-table">
+                        <thead>
+                            <tr>
+                                <th>Departamento</th>
+                                {dayNumbers.map(day => <th key={day}>{day}</th>)}
+                            </tr>
+                        </thead>
+                        <tbody>
+                            {departments.length > 0 ? departments.map(dept => (
+                                <tr key={dept.key}>
+                                    <td className="coverage-department">{dept.name} ({dept.headcount})</td>
+                                    {dayNumbers.map(day => {
+                                        const counts = dept.days[toDateString(year, month, day)] || { absent: 0, pending: 0 };
+                                        return (
+                                            <td
+                                                key={day}
+                                                className={`coverage-cell coverage-level-${getCoverageLevel(counts.absent, dept.headcount)}`}
+                                                title={`${counts.absent} ausentes, ${counts.pending} pendientes de ${dept.headcount}`}
+                                            >
+                                                {counts.absent > 0 ? counts.absent : ''}
+                                                {counts.pending > 0 && <sup className="coverage-pending">+{counts.pending}</sup>}
+                                            </td>
+                                        );
+                                    })}
+                                </tr>
+                            )) : (
+                                <tr><td colSpan={daysInMonth + 1}>No hay empleados en la empresa.</td></tr>
+                            )}
+                        </tbody>
+                    </table>
+                </div>
+            )}
+        </div>
+    );
+};
+
+export default HRCoverage;
@@ -1,9 +1,12 @@
 import React, { useState, useEffect } from 'react';
 import { supabase } from '../../supabaseClient';
 import { useAuth } from '../../context/AuthContext';
+import Pagination from '../../components/hr/Pagination';
 import './HRPanel.css';
 import './HREmployees.css';
 
+const PAGE_SIZE = 25;
+
 const EmployeeForm = ({ employee, schedules, departments, clients, assignedClientIds, onSave, onCancel, isSaving, settings }) => {
     const [formData, setFormData] = useState(employee || {});
     const [avatarFile, setAvatarFile] = useState(null);
@@ -118,71 +121,140 @@ const HREmployees = () => {
     const [employees, setEmployees] = useState([]);
     const [schedules, setSchedules] = useState([]);
     const [departments, setDepartments] = useState([]);
-    const [clients, setClients] = useState([]);
-    const [assignments, setAssignments] = useState([]);
+    const [clients, setClients] = useState(null);
+    const [assignedClientIds, setAssignedClientIds] = useState([]);
     const [isFormVisible, setIsFormVisible] = useState(false);
     const [editingEmployee, setEditingEmployee] = useState(null);
     const [loading, setLoading] = useState(true);
     const [isSaving, setIsSaving] = useState(false);
     const [error, setError] = useState('');
+    const [page, setPage] = useState(0);
+    const [totalCount, setTotalCount] = useState(0);
+    const [searchInput, setSearchInput] = useState('');
+    const [filters, setFilters] = useState({ search: '', departmentId: '', scheduleId: '' });
+    const [sort, setSort] = useState({ column: 'full_name', ascending: true });
 
-    const fetchData = async () => {
+    // Schedules and departments are small and needed for the filters and the form
+    useEffect(() => {
         if (!companyId) return;
-        setLoading(true);
-        try {
+        const fetchReferenceData = async () => {
             const [
-                { data: employeesData, error: employeesError },
                 { data: schedulesData, error: schedulesError },
-                { data: departmentsData, error: departmentsError },
-                { data: clientsData, error: clientsError },
-                { data: assignmentsData, error: assignmentsError }
+                { data: departmentsData, error: departmentsError }
             ] = await Promise.all([
-                supabase.from('employees').select('*, schedule:schedules(name), department:departments(name)').eq('company_id', companyId).order('full_name', { ascending: true }),
-                supabase.from('schedules').select('*').eq('company_id', companyId).order('name', { ascending: true }),
-                supabase.from('departments').select('*').eq('company_id', companyId).order('name', { ascending: true }),
-                supabase.from('clients').select('*').eq('company_id', companyId).order('name', { ascending: true }),
-                supabase.from('employee_client_assignments').select('*').eq('company_id', companyId)
+                supabase.from('schedules').select('id, name').eq('company_id', companyId).order('name', { ascending: true }),
+                supabase.from('departments').select('id, name').eq('company_id', companyId).order('name', { ascending: true })
             ]);
 
-            if (employeesError || schedulesError || departmentsError || clientsError || assignmentsError) {
-                throw employeesError || schedulesError || departmentsError || clientsError || assignmentsError;
+            if (schedulesError || departmentsError) {
+                setError('No se pudieron cargar los datos.');
+                console.error(schedulesError || departmentsError);
+                return;
             }
-
-            const filteredEmployees = employeesData.filter(emp => emp.role !== 'Super Admin');
-
-            const employeesWithAssignments = filteredEmployees.map(emp => ({
-                ...emp,
-                assigned_clients: assignmentsData
-                    .filter(a => a.employee_id === emp.id)
-                    .map(a => clientsData.find(c => c.id === a.client_id)?.name)
-                    .filter(Boolean)
-            }));
-
-            setEmployees(employeesWithAssignments);
             setSchedules(schedulesData);
             setDepartments(departmentsData);
-            setClients(clientsData);
-            setAssignments(assignmentsData);
-        } catch (err) {
+        };
+        fetchReferenceData();
+    }, [companyId]);
+
+    const fetchEmployees = async () => {
+        if (!companyId) return;
+        setLoading(true);
+        setError('');
+
+        const { data, error: rpcError } = await supabase.rpc('search_employees', {
+            p_company_id: companyId,
+            p_search: filters.search || null,
+            p_department_id: filters.departmentId ? Number(filters.departmentId) : null,
+            p_schedule_id: filters.scheduleId ? Number(filters.scheduleId) : null,
+            p_sort: sort.column,
+            p_ascending: sort.ascending,
+            p_limit: PAGE_SIZE,
+            p_offset: page * PAGE_SIZE,
+        });
+
+        if (rpcError) {
             setError('No se pudieron cargar los datos.');
-            console.error(err);
-        } finally {
-            setLoading(false);
+            console.error(rpcError);
+        } else {
+            setEmployees(data);
+            setTotalCount(data.length > 0 ? data[0].total_count : 0);
         }
+        setLoading(false);
     };
 
     useEffect(() => {
-        fetchData();
-    }, [companyId]);
+        fetchEmployees();
+    }, [companyId, page, filters, sort]);
+
+    // Debounce the name search so typing does not fire a query per keystroke
+    useEffect(() => {
+        const timeout = setTimeout(() => {
+            const search = searchInput.trim();
+            setFilters(prev => (prev.search === search ? prev : { ...prev, search }));
+            setPage(0);
+        }, 300);
+        return () => clearTimeout(timeout);
+    }, [searchInput]);
+
+    const handleFilterChange = (e) => {
+        const { name, value } = e.target;
+        setFilters(prev => ({ ...prev, [name]: value }));
+        setPage(0);
+    };
+
+    const handleSort = (column) => {
+        setSort(currentSort => ({
+            column,
+            ascending: currentSort.column === column ? !currentSort.ascending : true,
+        }));
+        setPage(0);
+    };
+
+    const renderSortableHeader = (column, label) => (
+        <th className="sortable-header" onClick={() => handleSort(column)}>
+            {label} {sort.column === column ? (sort.ascending ? '▲' : '▼') : ''}
+        </th>
+    );
+
+    // Clients and the employee's assignments are only needed once the form is opened
+    const loadClientAssignments = async (employeeId) => {
+        if (!settings?.has_clients_module) return;
+
+        const [clientsRes, assignmentsRes] = await Promise.all([
+            clients === null
+                ? supabase.from('clients').select('id, name').eq('company_id', companyId).order('name', { ascending: true })
+                : Promise.resolve({ data: clients, error: null }),
+            employeeId
+                ? supabase.from('employee_client_assignments').select('client_id').eq('employee_id', employeeId).eq('company_id', companyId)
+                : Promise.resolve({ data: [], error: null })
+        ]);
+
+        if (clientsRes.error || assignmentsRes.error) {
+            throw clientsRes.error || assignmentsRes.error;
+        }
+        setClients(clientsRes.data);
+        setAssignedClientIds(assignmentsRes.data.map(a => a.client_id));
+    };
+
+    const openForm = async (employee) => {
+        setError('');
+        try {
+            await loadClientAssignments(employee?.id);
+            setEditingEmployee(employee);
+            setIsFormVisible(true);
+        } catch (err) {
+            setError('No se pudieron cargar los clientes asignados.');
+            console.error(err);
+        }
+    };
 
     const handleAdd = () => {
-        setEditingEmployee(null);
-        setIsFormVisible(true);
+        openForm(null);
     };
 
     const handleEdit = (employee) => {
-        setEditingEmployee(employee);
-        setIsFormVisible(true);
+        openForm(employee);
     };
 
     const handleDelete = async (employeeId) => {
@@ -190,14 +262,14 @@ const HREmployees = () => {
             try {
                 const { error } = await supabase.from('employees').delete().eq('id', employeeId).eq('company_id', companyId);
                 if (error) throw error;
-                fetchData();
+                fetchEmployees();
             } catch (err) {
                 setError(`Error al eliminar: ${err.message}`);
             }
         }
     };
 
-    const handleSave = async (employeeData, avatarFile, assignedClientIds) => {
+    const handleSave = async (employeeData, avatarFile, selectedClientIds) => {
         setIsSaving(true);
         setError('');
         try {
@@ -209,7 +281,8 @@ const HREmployees = () => {
                 avatarUrl = supabase.storage.from('avatars').getPublicUrl(filePath).data.publicUrl;
             }
 
-            const { id, ...formData } = employeeData;
+            // Names and the total count come from the directory search, not the employees table
+            const { id, department_name, schedule_name, total_count, ...formData } = employeeData;
             const record = {
                 ...formData,
                 avatar_url: avatarUrl,
@@ -224,17 +297,17 @@ const HREmployees = () => {
                 const { error } = await supabase.from('employees').update(record).eq('id', id).eq('company_id', companyId);
                 if (error) throw error;
             } else { // Create new employee
-                const { data, error } = await supabase.from('employees').insert([{ ...record, company_id: companyId }]).select().single();
+                const { data, error } = await supabase.from('employees').insert([{ ...record, company_id: companyId }]).select('id').single();
                 if (error) throw error;
                 savedEmployeeId = data.id;
             }
 
             // Manage Client Assignments if the module is enabled
             if (settings?.has_clients_module) {
-                const currentAssignments = assignments.filter(a => a.employee_id === savedEmployeeId).map(a => a.client_id);
-                const newAssignments = new Set(assignedClientIds);
+                const currentAssignments = id ? assignedClientIds : [];
+                const newAssignments = new Set(selectedClientIds);
 
-                const toAdd = assignedClientIds.filter(cid => !currentAssignments.includes(cid));
+                const toAdd = selectedClientIds.filter(cid => !currentAssignments.includes(cid));
                 const toRemove = currentAssignments.filter(cid => !newAssignments.has(cid));
 
                 if (toAdd.length > 0) {
@@ -251,7 +324,7 @@ const HREmployees = () => {
 
             setIsFormVisible(false);
             setEditingEmployee(null);
-            fetchData();
+            fetchEmployees();
 
         } catch (err) {
             setError(`Error al guardar: ${err.message}`);
@@ -265,16 +338,31 @@ const HREmployees = () => {
         setEditingEmployee(null);
     };
 
-    const assignedClientIds = editingEmployee ? assignments.filter(a => a.employee_id === editingEmployee.id).map(a => a.client_id) : [];
-
     return (
         <div className="hr-panel-container">
-            {isFormVisible && <EmployeeForm employee={editingEmployee} schedules={schedules} departments={departments} clients={clients} assignedClientIds={assignedClientIds} onSave={handleSave} onCancel={handleCancel} isSaving={isSaving} settings={settings} />}
+            {isFormVisible && <EmployeeForm employee={editingEmployee} schedules={schedules} departments={departments} clients={clients || []} assignedClientIds={assignedClientIds} onSave={handleSave} onCancel={handleCancel} isSaving={isSaving} settings={settings} />}
             <div className="hr-panel-header">
                 <h1>Gestión de Empleados</h1>
                 <button onClick={handleAdd} className="hr-panel-add-btn">+ Añadir Empleado</button>
             </div>
 
+            <div className="employee-filters">
+                <input
+                    type="search"
+                    placeholder="Buscar por nombre..."
+                    value={searchInput}
+                    onChange={(e) => setSearchInput(e.target.value)}
+                />
+                <select name="departmentId" value={filters.departmentId} onChange={handleFilterChange}>
+                    <option value="">Todos los departamentos</option>
+                    {departments.map(d => <option key={d.id} value={d.id}>{d.name}</option>)}
+                </select>
+                <select name="scheduleId" value={filters.scheduleId} onChange={handleFilterChange}>
+                    <option value="">Todos los horarios</option>
+                    {schedules.map(s => <option key={s.id} value={s.id}>{s.name}</option>)}
+                </select>
+            </div>
+
             {loading && <p>Cargando...</p>}
             {error && <p className="error-message">{error}</p>}
 
@@ -284,31 +372,32 @@ const HREmployees = () => {
                         <thead>
                             <tr>
                                 <th>Avatar</th>
-                                <th>Nombre</th>
-                                <th>Rol</th>
-                                <th>Departamento</th>
-                                <th>Horario</th>
-                                {settings?.has_clients_module && <th>Clientes Asignados</th>}
+                                {renderSortableHeader('full_name', 'Nombre')}
+                                {renderSortableHeader('role', 'Rol')}
+                                {renderSortableHeader('department', 'Departamento')}
+                                {renderSortableHeader('schedule', 'Horario')}
                                 <th>Acciones</th>
                             </tr>
                         </thead>
                         <tbody>
-                            {employees.map(employee => (
+                            {employees.length > 0 ? employees.map(employee => (
                                 <tr key={employee.id}>
                                     <td><img src={employee.avatar_url || `https://i.pravatar.cc/150?u=${employee.id}`} alt={employee.full_name} className="employee-table-avatar" /></td>
                                     <td>{employee.full_name}</td>
                                     <td>{employee.role}</td>
-                                    <td>{employee.department?.name || 'Sin asignar'}</td>
-                                    <td>{employee.schedule?.name || 'Sin asignar'}</td>
-                                    {settings?.has_clients_module && <td>{employee.assigned_clients.join(', ')}</td>}
+                                    <td>{employee.department_name || 'Sin asignar'}</td>
+                                    <td>{employee.schedule_name || 'Sin asignar'}</td>
                                     <td>
                                         <button onClick={() => handleEdit(employee)} className="action-btn edit-btn">Editar</button>
                                         <button onClick={() => handleDelete(employee.id)} className="action-btn delete-btn">Eliminar</button>
                                     </td>
                                 </tr>
-                            ))}
+                            )) : (
+                                <tr><td colSpan="6">No se encontraron empleados.</td></tr>
+                            )}
                         </tbody>
                     </table>
+                    <Pagination page={page} pageSize={PAGE_SIZE} totalCount={totalCount} onPageChange={setPage} />
                 </div>
             )}
         </div>
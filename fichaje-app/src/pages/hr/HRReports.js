@@ -4,9 +4,13 @@ import { useAuth } from '../../context/AuthContext';
 import { getTheoreticalHoursForDay, calculateActualWorkedHours } from '../../utils/hours';
 import './HRReports.css';
 
+const EMPLOYEE_OPTIONS_LIMIT = 50;
+
 const HRReports = () => {
     const { companyId } = useAuth();
     const [employees, setEmployees] = useState([]);
+    const [employeeSearch, setEmployeeSearch] = useState('');
+    const [selectedEmployee, setSelectedEmployee] = useState(null);
     const [departments, setDepartments] = useState([]);
     const [timeEntries, setTimeEntries] = useState([]);
     const [summaryData, setSummaryData] = useState([]);
@@ -25,29 +29,49 @@ const HRReports = () => {
 
     useEffect(() => {
         if (!companyId) return;
-        const fetchData = async () => {
-            const [
-                { data: employeesData, error: employeesError },
-                { data: departmentsData, error: departmentsError }
-            ] = await Promise.all([
-                supabase.from('employees').select('id, full_name').eq('company_id', companyId).neq('role', 'Super Admin').order('full_name'),
-                supabase.from('departments').select('id, name').eq('company_id', companyId).order('name')
-            ]);
-
-            if (employeesError) setError('No se pudo cargar la lista de empleados.');
-            else setEmployees(employeesData);
+        const fetchDepartments = async () => {
+            const { data: departmentsData, error: departmentsError } = await supabase
+                .from('departments').select('id, name').eq('company_id', companyId).order('name');
 
             if (departmentsError) setError('No se pudo cargar la lista de departamentos.');
             else setDepartments(departmentsData);
         };
-        fetchData();
+        fetchDepartments();
     }, [companyId]);
 
+    // The employee dropdown is backed by the directory search instead of the full list
+    useEffect(() => {
+        if (!companyId) return;
+        const timeout = setTimeout(async () => {
+            const { data: employeesData, error: employeesError } = await supabase.rpc('search_employees', {
+                p_company_id: companyId,
+                p_search: employeeSearch.trim() || null,
+                p_department_id: filters.departmentId ? Number(filters.departmentId) : null,
+                p_limit: EMPLOYEE_OPTIONS_LIMIT,
+            });
+
+            if (employeesError) setError('No se pudo cargar la lista de empleados.');
+            else setEmployees(employeesData);
+        }, 300);
+        return () => clearTimeout(timeout);
+    }, [companyId, employeeSearch, filters.departmentId]);
+
     const handleFilterChange = (e) => {
         const { name, value } = e.target;
         setFilters(prev => ({ ...prev, [name]: value }));
     };
 
+    const handleEmployeeChange = (e) => {
+        const { value } = e.target;
+        setFilters(prev => ({ ...prev, employeeId: value }));
+        setSelectedEmployee(employees.find(emp => emp.id === value) || null);
+    };
+
+    // Keep the chosen employee selectable even when a new search no longer returns it
+    const employeeOptions = selectedEmployee && !employees.some(emp => emp.id === selectedEmployee.id)
+        ? [selectedEmployee, ...employees]
+        : employees;
+
     const calculateHoursSummary = (entries) => {
         const summary = {};
         const entriesByEmployee = entries.reduce((acc, entry) => {
@@ -234,9 +258,15 @@ const HRReports = () => {
                 <div className="filters-container">
                     <div className="filter-group">
                         <label htmlFor="employeeId">Empleado</label>
-                        <select id="employeeId" name="employeeId" value={filters.employeeId} onChange={handleFilterChange}>
+                        <input
+                            type="search"
+                            placeholder="Buscar empleado..."
+                            value={employeeSearch}
+                            onChange={(e) => setEmployeeSearch(e.target.value)}
+                        />
+                        <select id="employeeId" name="employeeId" value={filters.employeeId} onChange={handleEmployeeChange}>
                             <option value="">Todos</option>
-                            {employees.map(emp => <option key={emp.id} value={emp.id}>{emp.full_name}</option>)}
+                            {employeeOptions.map(emp => <option key={emp.id} value={emp.id}>{emp.full_name}</option>)}
                         </select>
                     </div>
                     <div className="filter-group">
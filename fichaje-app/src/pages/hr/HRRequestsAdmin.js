@@ -1,132 +1,133 @@
 import React, { useState, useEffect } from 'react';
 import { supabase } from '../../supabaseClient';
 import { useAuth } from '../../context/AuthContext';
+import Pagination from '../../components/hr/Pagination';
 import './HRPanel.css';
 import '../Requests.css';
 
+const PAGE_SIZE = 50;
+// Reload the page once bulk actions leave fewer rows than this on screen.
+const REFILL_THRESHOLD = PAGE_SIZE / 2;
+
 const HRRequestsAdmin = () => {
     const { companyId } = useAuth();
     const [requests, setRequests] = useState([]);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState('');
     const [filter, setFilter] = useState('Pendiente');
+    const [page, setPage] = useState(0);
+    const [totalCount, setTotalCount] = useState(0);
+    const [selectedIds, setSelectedIds] = useState([]);
+    const [processing, setProcessing] = useState(false);
 
     const fetchRequests = async () => {
         if (!companyId) return;
         setLoading(true);
         setError('');
 
+        const from = page * PAGE_SIZE;
         let query = supabase
             .from('requests')
-            .select('*')
+            .select('id, created_at, employee_name, request_type, start_date, end_date, comments, status', { count: 'exact' })
             .eq('company_id', companyId)
-            .order('created_at', { ascending: false });
+            .order('created_at', { ascending: false })
+            .range(from, from + PAGE_SIZE - 1);
 
         if (filter !== 'Todas') {
             query = query.eq('status', filter);
         }
 
-        const { data, error: fetchError } = await query;
+        const { data, count, error: fetchError } = await query;
 
         if (fetchError) {
             console.error('Error fetching requests:', fetchError);
             setError('No se pudieron cargar las solicitudes.');
         } else {
             setRequests(data);
+            setTotalCount(count || 0);
         }
+        setSelectedIds([]);
         setLoading(false);
     };
 
     useEffect(() => {
         fetchRequests();
-    }, [filter, companyId]);
+    }, [filter, page, companyId]);
 
-    const handleUpdateRequest = async (requestId, newStatus) => {
-        const originalRequests = [...requests];
-        const requestToUpdate = requests.find(req => req.id === requestId);
+    const handleFilterChange = (newFilter) => {
+        setFilter(newFilter);
+        setPage(0);
+    };
 
-        if (!requestToUpdate) return;
+    // Approves or rejects the given requests in one transaction on the server and
+    // patches the current page with the returned rows instead of refetching it.
+    const processRequests = async (requestIds, newStatus) => {
+        if (requestIds.length === 0) return;
+        setProcessing(true);
 
-        // Optimistically update UI
-        const updatedRequests = requests.map(req =>
-            req.id === requestId ? { ...req, status: newStatus } : req
-        );
-        setRequests(updatedRequests.filter(req => newStatus === 'Pendiente' || req.id !== requestId));
-
-        // If approving a clock-in error, also create an incident
-        if (newStatus === 'Aprobada' && requestToUpdate.request_type === 'Error en el fichaje') {
-            try {
-                const description = `Error de fichaje. Hora real: ${requestToUpdate.hora_entrada_real}, Hora fichada: ${requestToUpdate.hora_entrada_fichada}. Notas: ${requestToUpdate.comments || 'N/A'}`;
-
-                // Resiliently get or create the incident type ID
-                let incidentTypeId;
-                const typeName = 'Error en el fichaje';
-
-                const { data: typeData, error: typeError } = await supabase
-                    .from('incident_types')
-                    .select('id')
-                    .eq('name', typeName)
-                    .eq('company_id', companyId)
-                    .single();
-
-                if (typeError && typeError.code !== 'PGRST116') { // PGRST116 is 'exact one row not found'
-                    throw typeError;
-                }
+        const { data, error: rpcError } = await supabase.rpc('process_requests', {
+            p_request_ids: requestIds,
+            p_status: newStatus,
+        });
+
+        setProcessing(false);
+
+        if (rpcError) {
+            console.error('Error processing requests:', rpcError);
+            alert(`Hubo un error al actualizar las solicitudes: ${rpcError.message}`);
+            return;
+        }
 
-                if (typeData) {
-                    incidentTypeId = typeData.id;
+        if (data.length < requestIds.length) {
+            alert('Algunas solicitudes ya habían sido procesadas por otro usuario.');
+        }
+
+        const processedById = new Map(data.map(req => [req.id, req]));
+
+        if (filter === 'Todas') {
+            setRequests(currentRequests => currentRequests.map(req =>
+                processedById.has(req.id) ? { ...req, status: processedById.get(req.id).status } : req
+            ));
+        } else {
+            // None of the requested rows are pending anymore, so they leave the current view.
+            const remainingRequests = requests.filter(req => !requestIds.includes(req.id));
+            const remainingCount = Math.max(0, totalCount - requestIds.length);
+            setRequests(remainingRequests);
+            setTotalCount(remainingCount);
+
+            // Pull in the rows from later pages instead of leaving a (nearly) empty page.
+            if (remainingRequests.length < REFILL_THRESHOLD && remainingCount > remainingRequests.length) {
+                const lastPage = Math.max(0, Math.ceil(remainingCount / PAGE_SIZE) - 1);
+                if (page > lastPage) {
+                    setPage(lastPage);
                 } else {
-                    // If not found, create it
-                    const { data: newTypeData, error: newTypeError } = await supabase
-                        .from('incident_types')
-                        .insert({ name: typeName, description: 'Generado automáticamente por el sistema.', company_id: companyId })
-                        .select('id')
-                        .single();
-
-                    if (newTypeError) {
-                        throw new Error(`No se pudo crear el tipo de incidencia necesario: ${newTypeError.message}`);
-                    }
-                    incidentTypeId = newTypeData.id;
+                    fetchRequests();
                 }
-
-                const newIncident = {
-                    employee_id: requestToUpdate.employee_id,
-                    company_id: companyId,
-                    incident_type_id: incidentTypeId,
-                    date: requestToUpdate.start_date,
-                    description: description,
-                    status: 'Cerrada'
-                };
-
-                const { error: incidentError } = await supabase.from('incidents').insert([newIncident]);
-                if (incidentError) throw incidentError;
-
-            } catch (err) {
-                console.error('Error creating incident from request:', err);
-                alert(`Error al crear la incidencia: ${err.message}`);
-                setRequests(originalRequests);
                 return;
             }
         }
+        setSelectedIds(currentIds => currentIds.filter(id => !requestIds.includes(id)));
+    };
 
-        const { error: updateError } = await supabase
-            .from('requests')
-            .update({ status: newStatus })
-            .eq('id', requestId)
-            .eq('company_id', companyId);
-
-        if (updateError) {
-            console.error('Error updating request:', updateError);
-            alert('Hubo un error al actualizar la solicitud. La lista se recargará.');
-            setRequests(originalRequests);
-            fetchRequests();
-        } else {
-             if (filter !== 'Todas') {
-                setRequests(currentRequests => currentRequests.filter(req => req.id !== requestId));
-            } else {
-                fetchRequests();
-            }
+    // Keep the current page within range when the number of matching requests shrinks.
+    useEffect(() => {
+        const lastPage = Math.max(0, Math.ceil(totalCount / PAGE_SIZE) - 1);
+        if (page > lastPage) {
+            setPage(lastPage);
         }
+    }, [totalCount, page]);
+
+    const pendingIdsOnPage = requests.filter(req => req.status === 'Pendiente').map(req => req.id);
+    const allPendingSelected = pendingIdsOnPage.length > 0 && pendingIdsOnPage.every(id => selectedIds.includes(id));
+
+    const toggleSelected = (requestId) => {
+        setSelectedIds(currentIds =>
+            currentIds.includes(requestId) ? currentIds.filter(id => id !== requestId) : [...currentIds, requestId]
+        );
+    };
+
+    const toggleSelectAll = () => {
+        setSelectedIds(allPendingSelected ? [] : pendingIdsOnPage);
     };
 
     return (
@@ -138,13 +139,23 @@ const HRRequestsAdmin = () => {
             <div className="filters-container" style={{ justifyContent: 'flex-start', marginBottom: '20px' }}>
                 <div className="filter-group">
                     <label htmlFor="status-filter">Filtrar por estado:</label>
-                    <select id="status-filter" value={filter} onChange={(e) => setFilter(e.target.value)}>
+                    <select id="status-filter" value={filter} onChange={(e) => handleFilterChange(e.target.value)}>
                         <option>Pendiente</option>
                         <option>Aprobada</option>
                         <option>Rechazada</option>
                         <option value="Todas">Todas</option>
                     </select>
                 </div>
+                {selectedIds.length > 0 && (
+                    <div className="action-buttons">
+                        <button onClick={() => processRequests(selectedIds, 'Aprobada')} className="action-btn-approve" disabled={processing}>
+                            Aprobar seleccionadas ({selectedIds.length})
+                        </button>
+                        <button onClick={() => processRequests(selectedIds, 'Rechazada')} className="action-btn-reject" disabled={processing}>
+                            Rechazar seleccionadas ({selectedIds.length})
+                        </button>
+                    </div>
+                )}
             </div>
 
             {error && <p className="error-message">{error}</p>}
@@ -155,6 +166,14 @@ const HRRequestsAdmin = () => {
                     <table className="hr-panel-table">
                         <thead>
                             <tr>
+                                <th>
+                                    <input
+                                        type="checkbox"
+                                        checked={allPendingSelected}
+                                        onChange={toggleSelectAll}
+                                        disabled={pendingIdsOnPage.length === 0 || processing}
+                                    />
+                                </th>
                                 <th>Empleado</th>
                                 <th>Tipo</th>
                                 <th>Inicio</th>
@@ -167,6 +186,16 @@ const HRRequestsAdmin = () => {
                         <tbody>
                             {requests.length > 0 ? requests.map(req => (
                                 <tr key={req.id}>
+                                    <td>
+                                        {req.status === 'Pendiente' && (
+                                            <input
+                                                type="checkbox"
+                                                checked={selectedIds.includes(req.id)}
+                                                onChange={() => toggleSelected(req.id)}
+                                                disabled={processing}
+                                            />
+                                        )}
+                                    </td>
                                     <td>{req.employee_name}</td>
                                     <td>{req.request_type}</td>
                                     <td>{new Date(req.start_date).toLocaleDateString()}</td>
@@ -176,21 +205,22 @@ const HRRequestsAdmin = () => {
                                     <td>
                                         {req.status === 'Pendiente' && (
                                             <div className="action-buttons">
-                                                <button onClick={() => handleUpdateRequest(req.id, 'Aprobada')} className="action-btn-approve">Aprobar</button>
-                                                <button onClick={() => handleUpdateRequest(req.id, 'Rechazada')} className="action-btn-reject">Rechazar</button>
+                                                <button onClick={() => processRequests([req.id], 'Aprobada')} className="action-btn-approve" disabled={processing}>Aprobar</button>
+                                                <button onClick={() => processRequests([req.id], 'Rechazada')} className="action-btn-reject" disabled={processing}>Rechazar</button>
                                             </div>
                                         )}
                                     </td>
                                 </tr>
                             )) : (
-                                <tr><td colSpan="7">No hay solicitudes con el estado seleccionado.</td></tr>
+                                <tr><td colSpan="8">No hay solicitudes con el estado seleccionado.</td></tr>
                             )}
                         </tbody>
                     </table>
+                    <Pagination page={page} pageSize={PAGE_SIZE} totalCount={totalCount} onPageChange={setPage} />
                 </div>
             )}
         </div>
     );
 };
 
-export default HRRequestsAdmin;
\ No newline at end of file
+export default HRRequestsAdmin;
@@ -0,0 +1,92 @@
+/* eslint-disable no-restricted-globals */
+
+// This service worker is compiled by react-scripts (Workbox InjectManifest) at build time.
+// It precaches the versioned app shell so kiosks and phones start without downloading
+// the bundle again, and keeps a stale-while-revalidate copy of the small reference data
+// the kiosk needs to render (company and employee list).
+
+import { clientsClaim } from 'workbox-core';
+import { ExpirationPlugin } from 'workbox-expiration';
+import { cleanupOutdatedCaches, createHandlerBoundToURL, precacheAndRoute } from 'workbox-precaching';
+import { registerRoute } from 'workbox-routing';
+import { CacheFirst, StaleWhileRevalidate } from 'workbox-strategies';
+import { CacheableResponsePlugin } from 'workbox-cacheable-response';
+
+clientsClaim();
+
+// Precache every asset generated by the build. Filenames carry content hashes, so each
+// deploy produces a new precache manifest and stale entries are removed on activation.
+precacheAndRoute(self.__WB_MANIFEST);
+cleanupOutdatedCaches();
+
+// Serve index.html for navigations so client-side routes work offline.
+const fileExtensionRegexp = new RegExp('/[^/?]+\\.[^/]+$');
+registerRoute(
+    ({ request, url }) => {
+        if (request.mode !== 'navigate') return false;
+        if (url.pathname.startsWith('/_')) return false;
+        if (url.pathname.match(fileExtensionRegexp)) return false;
+        return true;
+    },
+    createHandlerBoundToURL(process.env.PUBLIC_URL + '/index.html')
+);
+
+// Google Fonts: the stylesheet may change, the font files behind it never do.
+registerRoute(
+    ({ url }) => url.origin === 'https://fonts.googleapis.com',
+    new StaleWhileRevalidate({ cacheName: 'google-fonts-stylesheets' })
+);
+registerRoute(
+    ({ url }) => url.origin === 'https://fonts.gstatic.com',
+    new CacheFirst({
+        cacheName: 'google-fonts-webfonts',
+        plugins: [
+            new CacheableResponsePlugin({ statuses: [0, 200] }),
+            new ExpirationPlugin({ maxAgeSeconds: 60 * 60 * 24 * 365, maxEntries: 30 }),
+        ],
+    })
+);
+
+// Logos and avatars shown on the kiosk grid.
+registerRoute(
+    ({ request, url }) => request.destination === 'image' && url.origin !== self.location.origin,
+    new StaleWhileRevalidate({
+        cacheName: 'images',
+        plugins: [
+            new CacheableResponsePlugin({ statuses: [0, 200] }),
+            new ExpirationPlugin({ maxAgeSeconds: 60 * 60 * 24 * 30, maxEntries: 200 }),
+        ],
+    })
+);
+
+// Kiosk reference data: the company lookup and the list of employees to clock in.
+// Only these read-only queries are cached; everything else always goes to the network.
+// Employee responses that select or filter on the PIN are never stored, so credentials
+// cannot end up in Cache Storage even if a query changes.
+const isKioskReferenceRequest = ({ request, url }) => {
+    if (request.method !== 'GET' || !url.pathname.includes('/rest/v1/')) return false;
+    if (url.pathname.endsWith('/companies')) return url.searchParams.has('name');
+    if (url.pathname.endsWith('/employees')) {
+        const select = (url.searchParams.get('select') || '*').split(',').map((column) => column.trim());
+        if (select.includes('*') || select.includes('pin') || url.searchParams.has('pin')) return false;
+        return url.searchParams.get('role') === 'eq.Empleado';
+    }
+    return false;
+};
+registerRoute(
+    isKioskReferenceRequest,
+    new StaleWhileRevalidate({
+        cacheName: 'kiosk-reference-data',
+        plugins: [
+            new CacheableResponsePlugin({ statuses: [200] }),
+            new ExpirationPlugin({ maxAgeSeconds: 60 * 60 * 24 * 7, maxEntries: 50 }),
+        ],
+    })
+);
+
+// Lets the page activate a freshly deployed worker as soon as it is installed.
+self.addEventListener('message', (event) => {
+    if (event.data && event.data.type === 'SKIP_WAITING') {
+        self.skipWaiting();
+    }
+});
@@ -0,0 +1,69 @@
+// Registers the service worker built from src/service-worker.js in production builds.
+// On deploy, the new worker installs in the background; onUpdate is called once it is
+// waiting so the app can decide when to switch to it.
+
+const isLocalhost = Boolean(
+    window.location.hostname === 'localhost' ||
+    window.location.hostname === '[::1]' ||
+    window.location.hostname.match(/^127(?:\.(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)){3}$/)
+);
+
+// Window event dispatched when a new version is ready but the page should not reload on
+// its own; event.detail.applyUpdate() switches to it.
+export const APP_UPDATE_EVENT = 'app-update-available';
+
+export function register(config = {}) {
+    if (process.env.NODE_ENV !== 'production' || !('serviceWorker' in navigator)) {
+        return;
+    }
+
+    // The service worker won't work if PUBLIC_URL is on a different origin from the page.
+    const publicUrl = new URL(process.env.PUBLIC_URL, window.location.href);
+    if (publicUrl.origin !== window.location.origin) {
+        return;
+    }
+
+    window.addEventListener('load', () => {
+        const swUrl = `${process.env.PUBLIC_URL}/service-worker.js`;
+
+        navigator.serviceWorker
+            .register(swUrl)
+            .then((registration) => {
+                // A version installed during an earlier visit may still be waiting.
+                if (registration.waiting && navigator.serviceWorker.controller && config.onUpdate) {
+                    config.onUpdate(registration);
+                }
+                registration.onupdatefound = () => {
+                    const installingWorker = registration.installing;
+                    if (!installingWorker) return;
+                    installingWorker.onstatechange = () => {
+                        if (installingWorker.state !== 'installed') return;
+                        if (navigator.serviceWorker.controller) {
+                            // A previous version is still in control: new content is waiting.
+                            if (config.onUpdate) config.onUpdate(registration);
+                        } else if (config.onSuccess) {
+                            // First install: the app shell is now precached for offline use.
+                            config.onSuccess(registration);
+                        }
+                    };
+                };
+            })
+            .catch((error) => {
+                console.error('Error during service worker registration:', error);
+            });
+
+        if (isLocalhost) {
+            navigator.serviceWorker.ready.then(() => {
+                console.log('This web app is being served cache-first by a service worker.');
+            });
+        }
+    });
+}
+
+export function unregister() {
+    if ('serviceWorker' in navigator) {
+        navigator.serviceWorker.ready
+            .then((registration) => registration.unregister())
+            .catch((error) => console.error(error.message));
+    }
+}
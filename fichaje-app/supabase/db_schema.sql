@@ -2,6 +2,11 @@
 -- Version 2.0
 
 -- Drop existing objects if they exist, in reverse order of dependency
+DROP TABLE IF EXISTS public.query_stats_snapshot_entries CASCADE;
+DROP TABLE IF EXISTS public.query_stats_snapshots CASCADE;
+DROP VIEW IF EXISTS public.query_stats_current;
+DROP VIEW IF EXISTS public.company_overview;
+DROP MATERIALIZED VIEW IF EXISTS public.company_stats;
 DROP TABLE IF EXISTS public.employee_client_assignments CASCADE;
 DROP TABLE IF EXISTS public.incidents CASCADE;
 DROP TABLE IF EXISTS public.incident_types CASCADE;
@@ -20,6 +25,24 @@ DROP TYPE IF EXISTS public.request_status CASCADE;
 DROP TYPE IF EXISTS public.schedule_type CASCADE;
 DROP TYPE IF EXISTS public.incident_status CASCADE;
 DROP FUNCTION IF EXISTS public.get_company_id(uuid);
+DROP FUNCTION IF EXISTS public.process_requests(bigint[], text);
+DROP FUNCTION IF EXISTS public.department_coverage(bigint, date, date);
+DROP FUNCTION IF EXISTS public.request_overlap(date, date);
+DROP FUNCTION IF EXISTS public.employee_home(uuid, timestamptz);
+DROP FUNCTION IF EXISTS public.detect_clocking_anomalies(date, text);
+DROP FUNCTION IF EXISTS public.search_employees(bigint, text, bigint, bigint, text, boolean, integer, integer);
+DROP FUNCTION IF EXISTS public.refresh_company_stats();
+DROP FUNCTION IF EXISTS public.top_queries(text, integer);
+DROP FUNCTION IF EXISTS public.create_query_stats_snapshot(text);
+DROP FUNCTION IF EXISTS public.query_stats_diff(bigint, bigint, text, integer);
+
+-- Extensions
+-- btree_gist lets scalar columns such as company_id share a GiST index with range columns.
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+-- pg_stat_statements records execution statistics for every statement (Super Admin query stats).
+CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
+-- pg_trgm backs substring search on employee names.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
 -- 1. Create Tables
 
@@ -63,6 +86,7 @@ CREATE TABLE public.employees (
     full_name text NOT NULL,
     pin text NOT NULL,
     role text NOT NULL,
+    avatar_url text,
     vacation_days integer DEFAULT 22 NOT NULL,
     company_id bigint NOT NULL REFERENCES public.companies(id) ON DELETE CASCADE,
     department_id bigint REFERENCES public.departments(id) ON DELETE SET NULL,
@@ -115,7 +139,9 @@ CREATE TABLE public.requests (
     start_date date NOT NULL,
     end_date date NOT NULL,
     comments text,
-    status text DEFAULT 'Pendiente' NOT NULL
+    status text DEFAULT 'Pendiente' NOT NULL,
+    period daterange GENERATED ALWAYS AS (daterange(start_date, end_date, '[]')) STORED,
+    CONSTRAINT requests_dates_ordered CHECK (end_date >= start_date)
 );
 COMMENT ON TABLE public.requests IS 'Stores employee requests for time off, etc.';
 
@@ -163,6 +189,25 @@ CREATE TABLE public.incidents (
 );
 COMMENT ON TABLE public.incidents IS 'Records specific employee incidents.';
 
+-- Query Stats Snapshots: Point-in-time copies of pg_stat_statements to compare deploys
+CREATE TABLE public.query_stats_snapshots (
+    id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    created_at timestamptz DEFAULT now() NOT NULL,
+    label text NOT NULL
+);
+COMMENT ON TABLE public.query_stats_snapshots IS 'Named snapshots of database query statistics, taken by Super Admins.';
+
+CREATE TABLE public.query_stats_snapshot_entries (
+    snapshot_id bigint NOT NULL REFERENCES public.query_stats_snapshots(id) ON DELETE CASCADE,
+    queryid bigint NOT NULL,
+    query text NOT NULL,
+    calls bigint NOT NULL,
+    total_exec_time double precision NOT NULL,
+    rows bigint NOT NULL,
+    PRIMARY KEY (snapshot_id, queryid)
+);
+COMMENT ON TABLE public.query_stats_snapshot_entries IS 'Per-statement counters captured in a query stats snapshot.';
+
 
 -- 2. Row Level Security (RLS)
 
@@ -199,6 +244,8 @@ ALTER TABLE public.holidays ENABLE ROW LEVEL SECURITY;
 ALTER TABLE public.absence_types ENABLE ROW LEVEL SECURITY;
 ALTER TABLE public.incident_types ENABLE ROW LEVEL SECURITY;
 ALTER TABLE public.incidents ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.query_stats_snapshots ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.query_stats_snapshot_entries ENABLE ROW LEVEL SECURITY;
 
 -- RLS Policies
 
@@ -238,7 +285,668 @@ CREATE POLICY "Allow HR to manage incidents in company" ON public.incidents FOR
 -- Assignments: HR can manage assignments in the company.
 CREATE POLICY "Allow HR to manage assignments in company" ON public.employee_client_assignments FOR ALL USING (company_id = public.get_company_id(auth.uid())) WITH CHECK (company_id = public.get_company_id(auth.uid()));
 
--- 3. Seed Data (Optional, for development)
+-- Query stats snapshots: Super Admins can list them; entries are only read through RPCs.
+CREATE POLICY "Allow Super Admin read access" ON public.query_stats_snapshots FOR SELECT USING (public.is_super_admin(auth.uid()));
+
+-- 3. Indexes
+
+-- Employees: the directory is paged by name within a company and searched by name fragments.
+CREATE INDEX employees_company_full_name_idx ON public.employees (company_id, full_name);
+CREATE INDEX employees_full_name_trgm_idx ON public.employees USING gin (full_name gin_trgm_ops);
+
+-- Requests: HR lists requests per company filtered by status, newest first.
+CREATE INDEX requests_company_status_created_idx ON public.requests (company_id, status, created_at DESC);
+-- Time Entries: employees read their own entries for a day in chronological order.
+CREATE INDEX time_entries_employee_created_idx ON public.time_entries (employee_id, created_at);
+-- Time Entries: per-company activity windows (reports, tenant statistics).
+CREATE INDEX time_entries_company_created_idx ON public.time_entries (company_id, created_at);
+-- Time Entries: the nightly anomaly scan reads one day across all companies. Entries are
+-- appended in time order, so a BRIN index covers that range at a fraction of a B-tree's size.
+CREATE INDEX time_entries_created_brin_idx ON public.time_entries USING brin (created_at);
+-- Incidents: the anomaly scan skips incidents it already recorded for an employee and day.
+CREATE INDEX incidents_employee_date_idx ON public.incidents (employee_id, date);
+-- Requests: coverage and overlap checks search by company and date range.
+CREATE INDEX requests_company_period_idx ON public.requests USING gist (company_id, period);
+
+-- 4. RPC Functions
+
+-- Approves or rejects many pending requests in a single transaction.
+-- Approving an 'Error en el fichaje' request also records a closed incident under
+-- the 'Error en el fichaje' incident type, creating the type if the company lacks it.
+-- Only HR managers may call it, and only for requests of their own company; the company
+-- comes from the caller's session, never from the client.
+-- Returns the updated requests so the client can patch its list in place.
+CREATE OR REPLACE FUNCTION public.process_requests(p_request_ids bigint[], p_status text)
+RETURNS SETOF public.requests
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_catalog
+AS $$
+DECLARE
+    v_company_id bigint := public.get_company_id(auth.uid());
+    v_incident_type_id bigint;
+BEGIN
+    IF (SELECT role FROM public.employees WHERE id = auth.uid()) IS DISTINCT FROM 'Gestor de RRHH' THEN
+        RAISE EXCEPTION 'Solo un Gestor de RRHH puede procesar solicitudes.' USING ERRCODE = '42501';
+    END IF;
+
+    IF p_status NOT IN ('Aprobada', 'Rechazada') THEN
+        RAISE EXCEPTION 'Estado no válido: %', p_status;
+    END IF;
+
+    IF p_status = 'Aprobada' THEN
+        INSERT INTO public.incident_types (name, description, company_id)
+        SELECT 'Error en el fichaje', 'Generado automáticamente por el sistema.', v_company_id
+        WHERE EXISTS (
+            SELECT 1 FROM public.requests
+            WHERE company_id = v_company_id
+              AND id = ANY(p_request_ids)
+              AND status = 'Pendiente'
+              AND request_type = 'Error en el fichaje'
+        )
+        ON CONFLICT (name, company_id) DO NOTHING;
+
+        SELECT id INTO v_incident_type_id
+        FROM public.incident_types
+        WHERE name = 'Error en el fichaje' AND company_id = v_company_id;
+    END IF;
+
+    -- The clock-in error columns are read through jsonb so the function does not
+    -- depend on them being present in every deployment of this schema.
+    RETURN QUERY
+    WITH updated AS (
+        UPDATE public.requests
+        SET status = p_status
+        WHERE company_id = v_company_id
+          AND id = ANY(p_request_ids)
+          AND status = 'Pendiente'
+        RETURNING *
+    ), logged AS (
+        INSERT INTO public.incidents (employee_id, company_id, incident_type_id, date, description, status)
+        SELECT
+            r.employee_id,
+            r.company_id,
+            v_incident_type_id,
+            r.start_date,
+            format('Error de fichaje. Hora real: %s, Hora fichada: %s. Notas: %s',
+                to_jsonb(r) ->> 'hora_entrada_real',
+                to_jsonb(r) ->> 'hora_entrada_fichada',
+                COALESCE(NULLIF(r.comments, ''), 'N/A')),
+            'Cerrada'
+        FROM updated r
+        WHERE v_incident_type_id IS NOT NULL
+          AND r.request_type = 'Error en el fichaje'
+    )
+    SELECT * FROM updated;
+END;
+$$;
+
+-- Per-department, per-day absence counts for a date range, used by the HR coverage heatmap.
+-- Every department with employees gets one row per day, even when nobody is absent.
+-- Only requests that take the employee away from work count as absences.
+CREATE OR REPLACE FUNCTION public.department_coverage(p_company_id bigint, p_start_date date, p_end_date date)
+RETURNS TABLE (department_id bigint, department_name text, day date, headcount integer, absent integer, pending integer)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH staff AS (
+        SELECT e.department_id, count(*)::integer AS headcount
+        FROM public.employees e
+        WHERE e.company_id = p_company_id
+          AND e.role <> 'Super Admin'
+        GROUP BY e.department_id
+    ), absences AS (
+        SELECT
+            e.department_id,
+            d.day::date AS day,
+            count(DISTINCT r.employee_id) FILTER (WHERE r.status = 'Aprobada')::integer AS absent,
+            count(DISTINCT r.employee_id) FILTER (WHERE r.status = 'Pendiente')::integer AS pending
+        FROM public.requests r
+        JOIN public.employees e ON e.id = r.employee_id
+        CROSS JOIN LATERAL generate_series(
+            greatest(lower(r.period), p_start_date),
+            least(upper(r.period) - 1, p_end_date),
+            interval '1 day'
+        ) AS d(day)
+        WHERE r.company_id = p_company_id
+          AND r.period && daterange(p_start_date, p_end_date, '[]')
+          AND r.status IN ('Aprobada', 'Pendiente')
+          AND r.request_type NOT IN ('Error en el fichaje', 'Solicitud cambio de horario')
+        GROUP BY e.department_id, d.day::date
+    )
+    SELECT
+        s.department_id,
+        COALESCE(dep.name, 'Sin departamento'),
+        days.day::date,
+        s.headcount,
+        COALESCE(a.absent, 0),
+        COALESCE(a.pending, 0)
+    FROM staff s
+    LEFT JOIN public.departments dep ON dep.id = s.department_id
+    CROSS JOIN generate_series(p_start_date, p_end_date, interval '1 day') AS days(day)
+    LEFT JOIN absences a ON a.department_id IS NOT DISTINCT FROM s.department_id AND a.day = days.day::date
+    ORDER BY 2, 3;
+$$;
+
+-- Checks a prospective absence of the calling employee before it is submitted: how many
+-- of their own pending or approved absences it overlaps, and how many department colleagues
+-- already have an approved absence within the same dates. Runs as the owner so colleagues'
+-- requests can be counted; the employee and company always come from auth.uid() and only
+-- counts are returned.
+CREATE OR REPLACE FUNCTION public.request_overlap(p_start_date date, p_end_date date)
+RETURNS TABLE (own_overlaps integer, colleagues_absent integer, department_headcount integer)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public, pg_catalog
+AS $$
+    WITH me AS (
+        SELECT id, company_id, department_id
+        FROM public.employees
+        WHERE id = auth.uid()
+          AND company_id = public.get_company_id(auth.uid())
+    )
+    SELECT
+        (SELECT count(*)::integer
+         FROM public.requests r
+         WHERE r.company_id = me.company_id
+           AND r.employee_id = me.id
+           AND r.period && daterange(p_start_date, p_end_date, '[]')
+           AND r.status IN ('Aprobada', 'Pendiente')
+           AND r.request_type NOT IN ('Error en el fichaje', 'Solicitud cambio de horario')),
+        (SELECT count(DISTINCT r.employee_id)::integer
+         FROM public.requests r
+         JOIN public.employees e ON e.id = r.employee_id
+         WHERE r.company_id = me.company_id
+           AND r.employee_id <> me.id
+           AND e.department_id = me.department_id
+           AND r.period && daterange(p_start_date, p_end_date, '[]')
+           AND r.status = 'Aprobada'
+           AND r.request_type NOT IN ('Error en el fichaje', 'Solicitud cambio de horario')),
+        (SELECT count(*)::integer
+         FROM public.employees e
+         WHERE e.company_id = me.company_id
+           AND e.department_id = me.department_id)
+    FROM me;
+$$;
+
+-- Everything the employee dashboard needs in one round trip: schedule, approved vacation
+-- days, the entries clocked since p_since (the start of the employee's local day) and the
+-- clients they can clock against. Clients are the employee's assigned ones, or every
+-- company client when the employee has no assignments; empty without the clients module.
+CREATE OR REPLACE FUNCTION public.employee_home(p_employee_id uuid, p_since timestamptz)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+    WITH me AS (
+        SELECT e.id, e.company_id, e.schedule_id, c.has_clients_module
+        FROM public.employees e
+        JOIN public.companies c ON c.id = e.company_id
+        WHERE e.id = p_employee_id
+    ), assigned AS (
+        SELECT cl.id, cl.name
+        FROM public.employee_client_assignments a
+        JOIN public.clients cl ON cl.id = a.client_id
+        WHERE a.employee_id = p_employee_id
+    )
+    SELECT jsonb_build_object(
+        'schedule', (
+            SELECT jsonb_build_object('name', s.name, 'schedule_type', s.schedule_type, 'hours_per_week', s.hours_per_week)
+            FROM public.schedules s
+            WHERE s.id = me.schedule_id
+        ),
+        'used_vacation_days', (
+            SELECT COALESCE(sum(r.end_date - r.start_date + 1), 0)
+            FROM public.requests r
+            WHERE r.employee_id = p_employee_id
+              AND r.company_id = me.company_id
+              AND r.request_type = 'Vacaciones'
+              AND r.status = 'Aprobada'
+        ),
+        'today_entries', (
+            SELECT COALESCE(jsonb_agg(jsonb_build_object('action', t.action, 'created_at', t.created_at) ORDER BY t.created_at), '[]'::jsonb)
+            FROM public.time_entries t
+            WHERE t.employee_id = p_employee_id
+              AND t.created_at >= p_since
+        ),
+        'clients', (
+            SELECT COALESCE(jsonb_agg(jsonb_build_object('id', cl.id, 'name', cl.name) ORDER BY cl.name), '[]'::jsonb)
+            FROM (
+                SELECT id, name FROM assigned
+                UNION ALL
+                SELECT id, name FROM public.clients
+                WHERE company_id = me.company_id
+                  AND NOT EXISTS (SELECT 1 FROM assigned)
+            ) cl
+            WHERE me.has_clients_module
+        )
+    )
+    FROM me;
+$$;
+
+-- One page of the company's employee directory, with department and schedule names.
+-- p_search matches any part of the name (trigram index); department and schedule filter
+-- exactly. p_sort is 'full_name', 'role', 'department' or 'schedule'. total_count is the
+-- number of matching employees before paging, repeated on every row.
+CREATE OR REPLACE FUNCTION public.search_employees(
+    p_company_id bigint,
+    p_search text DEFAULT NULL,
+    p_department_id bigint DEFAULT NULL,
+    p_schedule_id bigint DEFAULT NULL,
+    p_sort text DEFAULT 'full_name',
+    p_ascending boolean DEFAULT true,
+    p_limit integer DEFAULT 25,
+    p_offset integer DEFAULT 0
+)
+RETURNS TABLE (
+    id uuid,
+    full_name text,
+    role text,
+    avatar_url text,
+    vacation_days integer,
+    department_id bigint,
+    department_name text,
+    schedule_id bigint,
+    schedule_name text,
+    total_count bigint
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH matches AS (
+        SELECT
+            e.id,
+            e.full_name,
+            e.role,
+            e.avatar_url,
+            e.vacation_days,
+            e.department_id,
+            d.name AS department_name,
+            e.schedule_id,
+            s.name AS schedule_name,
+            CASE p_sort
+                WHEN 'role' THEN e.role
+                WHEN 'department' THEN d.name
+                WHEN 'schedule' THEN s.name
+                ELSE e.full_name
+            END AS sort_key
+        FROM public.employees e
+        LEFT JOIN public.departments d ON d.id = e.department_id
+        LEFT JOIN public.schedules s ON s.id = e.schedule_id
+        WHERE e.company_id = p_company_id
+          AND e.role <> 'Super Admin'
+          -- The search text is matched literally: LIKE wildcards and the escape character are escaped.
+          AND (p_search IS NULL OR p_search = ''
+               OR e.full_name ILIKE '%' || replace(replace(replace(p_search, '\', '\\'), '%', '\%'), '_', '\_') || '%')
+          AND (p_department_id IS NULL OR e.department_id = p_department_id)
+          AND (p_schedule_id IS NULL OR e.schedule_id = p_schedule_id)
+    )
+    SELECT
+        m.id, m.full_name, m.role, m.avatar_url, m.vacation_days,
+        m.department_id, m.department_name, m.schedule_id, m.schedule_name,
+        count(*) OVER ()
+    FROM matches m
+    ORDER BY
+        CASE WHEN p_ascending THEN m.sort_key END ASC,
+        CASE WHEN NOT p_ascending THEN m.sort_key END DESC,
+        m.full_name,
+        m.id
+    LIMIT p_limit
+    OFFSET p_offset;
+$$;
+
+-- Nightly batch job: scans one day of time entries (in p_timezone) in a single indexed pass
+-- and records an incident under 'Error en el fichaje' for every clocking anomaly found:
+--   * an 'Entrada' while the employee was already working (double clock-in),
+--   * a day that ends on 'Pausa' (missing 'Salida'),
+--   * a day that ends on 'Entrada' or 'Reanudar' (session left open overnight).
+-- Already recorded anomalies are skipped, so re-running a day is safe.
+-- Returns the number of incidents created.
+CREATE OR REPLACE FUNCTION public.detect_clocking_anomalies(p_day date, p_timezone text DEFAULT 'Europe/Madrid')
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_created integer;
+BEGIN
+    WITH day_entries AS (
+        SELECT
+            t.employee_id,
+            t.company_id,
+            t.action,
+            t.created_at,
+            lag(t.action) OVER (PARTITION BY t.employee_id ORDER BY t.created_at) AS previous_action,
+            row_number() OVER (PARTITION BY t.employee_id ORDER BY t.created_at DESC) AS position_from_end
+        FROM public.time_entries t
+        WHERE t.created_at >= (p_day::timestamp AT TIME ZONE p_timezone)
+          AND t.created_at < ((p_day + 1)::timestamp AT TIME ZONE p_timezone)
+    ), anomalies AS (
+        SELECT
+            employee_id,
+            company_id,
+            format('Entrada duplicada a las %s sin salida previa.',
+                to_char(created_at AT TIME ZONE p_timezone, 'HH24:MI')) AS description
+        FROM day_entries
+        WHERE action = 'Entrada'
+          AND previous_action IN ('Entrada', 'Reanudar')
+        UNION ALL
+        SELECT
+            employee_id,
+            company_id,
+            CASE WHEN action = 'Pausa'
+                THEN format('Falta el fichaje de salida: la jornada terminó en pausa a las %s.',
+                    to_char(created_at AT TIME ZONE p_timezone, 'HH24:MI'))
+                ELSE format('Sesión abierta durante la noche: último fichaje "%s" a las %s sin salida.',
+                    action, to_char(created_at AT TIME ZONE p_timezone, 'HH24:MI'))
+            END
+        FROM day_entries
+        WHERE position_from_end = 1
+          AND action <> 'Salida'
+    ), new_types AS (
+        INSERT INTO public.incident_types (name, description, company_id)
+        SELECT DISTINCT 'Error en el fichaje', 'Generado automáticamente por el sistema.', company_id
+        FROM anomalies
+        ON CONFLICT (name, company_id) DO NOTHING
+        RETURNING id, company_id
+    ), types AS (
+        SELECT id, company_id FROM new_types
+        UNION ALL
+        SELECT id, company_id FROM public.incident_types WHERE name = 'Error en el fichaje'
+    ), created AS (
+        INSERT INTO public.incidents (employee_id, company_id, incident_type_id, date, description)
+        SELECT a.employee_id, a.company_id, ty.id, p_day, a.description
+        FROM anomalies a
+        JOIN types ty ON ty.company_id = a.company_id
+        WHERE NOT EXISTS (
+            SELECT 1 FROM public.incidents i
+            WHERE i.employee_id = a.employee_id
+              AND i.date = p_day
+              AND i.incident_type_id = ty.id
+              AND i.description = a.description
+        )
+        RETURNING 1
+    )
+    SELECT count(*) INTO v_created FROM created;
+
+    RETURN v_created;
+END;
+$$;
+
+-- Writes across every tenant, so only the service role (edge function, pg_cron) may run it.
+REVOKE EXECUTE ON FUNCTION public.detect_clocking_anomalies(date, text) FROM PUBLIC, anon, authenticated;
+
+-- Scan the previous day every night at 03:00 when pg_cron is available.
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule(
+            'detect-clocking-anomalies',
+            '0 3 * * *',
+            'SELECT public.detect_clocking_anomalies(current_date - 1)'
+        );
+    END IF;
+END;
+$$;
+
+-- 5. Views and Monitoring
+
+-- Per-company load statistics for the Super Admin overview. Computing them touches every
+-- tenant's time entries and stored files, so they are materialized and refreshed
+-- periodically instead of on each page load.
+CREATE MATERIALIZED VIEW public.company_stats AS
+SELECT
+    c.id AS company_id,
+    COALESCE(e.employee_count, 0) AS employee_count,
+    round(t.entries_last_30_days / 30.0, 1) AS time_entries_per_day,
+    COALESCE(f.storage_bytes, 0) AS storage_bytes,
+    GREATEST(lt.last_entry_at, r.last_request_at) AS last_activity_at,
+    now() AS refreshed_at
+FROM public.companies c
+LEFT JOIN (
+    SELECT company_id, count(*) AS employee_count
+    FROM public.employees
+    GROUP BY company_id
+) e ON e.company_id = c.id
+-- Both time entry lookups are range scans on time_entries_company_created_idx, so a refresh
+-- reads the last 30 days per company rather than its whole history.
+CROSS JOIN LATERAL (
+    SELECT count(*) AS entries_last_30_days
+    FROM public.time_entries te
+    WHERE te.company_id = c.id
+      AND te.created_at >= now() - interval '30 days'
+) t
+LEFT JOIN LATERAL (
+    SELECT te.created_at AS last_entry_at
+    FROM public.time_entries te
+    WHERE te.company_id = c.id
+    ORDER BY te.created_at DESC
+    LIMIT 1
+) lt ON true
+CROSS JOIN LATERAL (
+    SELECT max(rq.created_at) AS last_request_at
+    FROM public.requests rq
+    WHERE rq.company_id = c.id
+) r
+LEFT JOIN (
+    SELECT files.company_id, sum(files.size) AS storage_bytes
+    FROM (
+        -- Uploaded documents are stored as 'justificantes/<employee_id>-<timestamp>.<ext>'.
+        SELECT emp.company_id, (o.metadata ->> 'size')::bigint AS size
+        FROM storage.objects o
+        JOIN public.employees emp ON emp.id::text = substr(o.name, 15, 36)
+        WHERE o.bucket_id = 'justificantes'
+        UNION ALL
+        -- Employee avatars are stored as 'public/<company_id>/<timestamp>-<file name>'.
+        SELECT split_part(o.name, '/', 2)::bigint, (o.metadata ->> 'size')::bigint
+        FROM storage.objects o
+        WHERE o.bucket_id = 'avatars'
+          AND o.name ~ '^public/[0-9]+/'
+    ) files
+    GROUP BY files.company_id
+) f ON f.company_id = c.id;
+
+-- Required by REFRESH MATERIALIZED VIEW CONCURRENTLY.
+CREATE UNIQUE INDEX company_stats_company_id_idx ON public.company_stats (company_id);
+
+-- Materialized views do not support RLS, so clients go through company_overview instead.
+REVOKE ALL ON public.company_stats FROM anon, authenticated;
+
+-- Live company data joined with the latest statistics, visible to Super Admins only.
+-- Newly created companies appear immediately with empty statistics until the next refresh.
+CREATE VIEW public.company_overview AS
+SELECT
+    c.id,
+    c.name,
+    c.created_at,
+    c.has_clients_module,
+    COALESCE(s.employee_count, 0) AS employee_count,
+    COALESCE(s.time_entries_per_day, 0) AS time_entries_per_day,
+    COALESCE(s.storage_bytes, 0) AS storage_bytes,
+    s.last_activity_at,
+    s.refreshed_at
+FROM public.companies c
+LEFT JOIN public.company_stats s ON s.company_id = c.id
+WHERE public.is_super_admin(auth.uid());
+
+-- On-demand refresh of the statistics for the Super Admin overview. Returns the new
+-- refresh time. Also the only way to update them on databases without pg_cron.
+CREATE OR REPLACE FUNCTION public.refresh_company_stats()
+RETURNS timestamptz
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_catalog
+AS $$
+BEGIN
+    IF NOT public.is_super_admin(auth.uid()) THEN
+        RAISE EXCEPTION 'Solo un Super Admin puede actualizar las estadísticas.' USING ERRCODE = '42501';
+    END IF;
+
+    REFRESH MATERIALIZED VIEW CONCURRENTLY public.company_stats;
+
+    RETURN now();
+END;
+$$;
+
+-- Refresh the statistics every 15 minutes when pg_cron is available.
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule(
+            'refresh-company-stats',
+            '*/15 * * * *',
+            'REFRESH MATERIALIZED VIEW CONCURRENTLY public.company_stats'
+        );
+    ELSE
+        RAISE NOTICE 'pg_cron no está instalado: company_stats no se actualizará automáticamente. Use refresh_company_stats() o instale pg_cron.';
+    END IF;
+END;
+$$;
+
+-- Current statement statistics for this database, one row per normalized query.
+-- pg_stat_statements keeps a row per role as well, so counters are summed across roles.
+CREATE VIEW public.query_stats_current AS
+SELECT
+    pss.queryid,
+    min(pss.query) AS query,
+    sum(pss.calls)::bigint AS calls,
+    sum(pss.total_exec_time) AS total_exec_time,
+    sum(pss.rows)::bigint AS rows
+FROM pg_stat_statements pss
+WHERE pss.dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+  AND pss.queryid IS NOT NULL
+GROUP BY pss.queryid;
+
+-- Exposes other tenants' SQL text, so it is only reachable through the Super Admin RPCs.
+REVOKE ALL ON public.query_stats_current FROM anon, authenticated;
+
+-- Top statements by 'total' time, 'mean' time, 'rows' or 'calls'. Super Admins only.
+CREATE OR REPLACE FUNCTION public.top_queries(p_order_by text DEFAULT 'total', p_limit integer DEFAULT 50)
+RETURNS TABLE (queryid bigint, query text, calls bigint, total_exec_time double precision, mean_exec_time double precision, rows bigint)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, extensions, pg_catalog
+AS $$
+BEGIN
+    IF NOT public.is_super_admin(auth.uid()) THEN
+        RAISE EXCEPTION 'Solo un Super Admin puede consultar las estadísticas.' USING ERRCODE = '42501';
+    END IF;
+
+    RETURN QUERY
+    SELECT q.queryid, q.query, q.calls, q.total_exec_time, q.total_exec_time / NULLIF(q.calls, 0), q.rows
+    FROM public.query_stats_current q
+    ORDER BY
+        CASE p_order_by
+            WHEN 'mean' THEN q.total_exec_time / NULLIF(q.calls, 0)
+            WHEN 'rows' THEN q.rows
+            WHEN 'calls' THEN q.calls
+            ELSE q.total_exec_time
+        END DESC NULLS LAST
+    LIMIT p_limit;
+END;
+$$;
+
+-- Copies the current statistics into a new named snapshot and returns its id. Super Admins only.
+CREATE OR REPLACE FUNCTION public.create_query_stats_snapshot(p_label text)
+RETURNS bigint
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, extensions, pg_catalog
+AS $$
+DECLARE
+    v_snapshot_id bigint;
+BEGIN
+    IF NOT public.is_super_admin(auth.uid()) THEN
+        RAISE EXCEPTION 'Solo un Super Admin puede crear snapshots.' USING ERRCODE = '42501';
+    END IF;
+
+    INSERT INTO public.query_stats_snapshots (label) VALUES (p_label) RETURNING id INTO v_snapshot_id;
+
+    INSERT INTO public.query_stats_snapshot_entries (snapshot_id, queryid, query, calls, total_exec_time, rows)
+    SELECT v_snapshot_id, q.queryid, q.query, q.calls, q.total_exec_time, q.rows
+    FROM public.query_stats_current q;
+
+    RETURN v_snapshot_id;
+END;
+$$;
+
+-- Work done between two snapshots, or between a snapshot and now when p_to_snapshot is null,
+-- ordered like top_queries. Statements that did not run in between are left out. Super Admins only.
+CREATE OR REPLACE FUNCTION public.query_stats_diff(p_from_snapshot bigint, p_to_snapshot bigint DEFAULT NULL, p_order_by text DEFAULT 'total', p_limit integer DEFAULT 50)
+RETURNS TABLE (queryid bigint, query text, calls bigint, total_exec_time double precision, mean_exec_time double precision, rows bigint)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, extensions, pg_catalog
+AS $$
+BEGIN
+    IF NOT public.is_super_admin(auth.uid()) THEN
+        RAISE EXCEPTION 'Solo un Super Admin puede consultar las estadísticas.' USING ERRCODE = '42501';
+    END IF;
+
+    RETURN QUERY
+    WITH later AS (
+        SELECT q.queryid, q.query, q.calls, q.total_exec_time, q.rows
+        FROM public.query_stats_current q
+        WHERE p_to_snapshot IS NULL
+        UNION ALL
+        SELECT e.queryid, e.query, e.calls, e.total_exec_time, e.rows
+        FROM public.query_stats_snapshot_entries e
+        WHERE e.snapshot_id = p_to_snapshot
+    ), delta AS (
+        -- Counters lower than in the earlier snapshot mean the statistics were reset in between.
+        SELECT
+            l.queryid,
+            l.query,
+            CASE WHEN l.calls >= COALESCE(f.calls, 0) THEN l.calls - COALESCE(f.calls, 0) ELSE l.calls END AS calls,
+            CASE WHEN l.calls >= COALESCE(f.calls, 0) THEN l.total_exec_time - COALESCE(f.total_exec_time, 0) ELSE l.total_exec_time END AS total_exec_time,
+            CASE WHEN l.calls >= COALESCE(f.calls, 0) THEN l.rows - COALESCE(f.rows, 0) ELSE l.rows END AS rows
+        FROM later l
+        LEFT JOIN public.query_stats_snapshot_entries f
+            ON f.snapshot_id = p_from_snapshot AND f.queryid = l.queryid
+    )
+    SELECT d.queryid, d.query, d.calls, d.total_exec_time, d.total_exec_time / NULLIF(d.calls, 0), d.rows
+    FROM delta d
+    WHERE d.calls > 0
+    ORDER BY
+        CASE p_order_by
+            WHEN 'mean' THEN d.total_exec_time / NULLIF(d.calls, 0)
+            WHEN 'rows' THEN d.rows
+            WHEN 'calls' THEN d.calls
+            ELSE d.total_exec_time
+        END DESC NULLS LAST
+    LIMIT p_limit;
+END;
+$$;
+
+-- Log the plans of a sample of slow statements when the auto_explain module is installed.
+-- The module is loaded first so a missing library never ends up in session_preload_libraries.
+-- The database-level setting replaces the server one, so auto_explain is appended to the
+-- libraries already preloaded (e.g. supautils) instead of overwriting them.
+DO $$
+DECLARE
+    v_libraries text[];
+BEGIN
+    LOAD 'auto_explain';
+
+    SELECT COALESCE(array_agg(trim(BOTH ' "' FROM lib)) FILTER (WHERE trim(BOTH ' "' FROM lib) <> ''), '{}')
+    INTO v_libraries
+    FROM unnest(string_to_array(COALESCE(current_setting('session_preload_libraries', true), ''), ',')) AS lib;
+
+    IF NOT 'auto_explain' = ANY (v_libraries) THEN
+        -- Each library is passed as its own literal: a single 'a, b' string would be read as one name.
+        EXECUTE format('ALTER DATABASE %I SET session_preload_libraries = %s', current_database(),
+            (SELECT string_agg(quote_literal(lib), ', ') FROM unnest(v_libraries || 'auto_explain'::text) AS lib));
+    END IF;
+    EXECUTE format('ALTER DATABASE %I SET auto_explain.log_min_duration = %L', current_database(), '500ms');
+    EXECUTE format('ALTER DATABASE %I SET auto_explain.sample_rate = %L', current_database(), '0.1');
+    EXECUTE format('ALTER DATABASE %I SET auto_explain.log_format = %L', current_database(), 'json');
+EXCEPTION
+    WHEN undefined_file OR insufficient_privilege THEN
+        RAISE NOTICE 'auto_explain no está disponible: %', SQLERRM;
+END;
+$$;
+
+-- 6. Seed Data (Optional, for development)
 -- Example of creating a Super Admin user
 -- This would be done manually or via a secure backend process in production
 -- INSERT INTO public.companies (name) VALUES ('Super Admin Company');
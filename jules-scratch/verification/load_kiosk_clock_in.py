@@ -0,0 +1,315 @@
+"""Load generator for the kiosk clock-in path.
+
+Simulates many kiosks sending clock events (inserts into ``time_entries``) against a
+local Postgres + PostgREST stand-in, following a configurable arrival curve, and prints
+a JSON report with throughput, latency percentiles and error rates so that runs before
+and after a schema or policy change can be compared.
+
+By default every insert is sent with a JWT minted for the employee clocking in, so the
+request goes through the same RLS policies (``get_company_id`` per row) as a real
+employee. ``--auth key`` sends one shared key instead; with the service-role key that
+bypasses RLS and only measures the raw insert path.
+
+Example:
+    python jules-scratch/verification/load_kiosk_clock_in.py \
+        --url http://localhost:54321/rest/v1 --key "$SUPABASE_ANON_KEY" \
+        --jwt-secret "$SUPABASE_JWT_SECRET" \
+        --kiosks 300 --curve burst --peak-rate 400 --duration 60 --seed 1 --output run.json
+
+Requires ``aiohttp``.
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import math
+import os
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+
+import aiohttp
+
+# Every inserted row carries this client_name prefix so a run can be cleaned up afterwards.
+RUN_MARKER_PREFIX = "loadtest-"
+
+
+def arrival_rate(curve, t, args):
+    """Returns the target number of clock events per second at ``t`` seconds into the run."""
+    if curve == "constant":
+        return args.peak_rate
+    if curve == "ramp":
+        return args.base_rate + (args.peak_rate - args.base_rate) * min(t / args.duration, 1.0)
+    if curve == "burst":
+        # Shift changes: Gaussian bursts evenly spaced over the run on top of a base rate.
+        spacing = args.duration / args.bursts
+        centers = [spacing * (i + 0.5) for i in range(args.bursts)]
+        peak = max(math.exp(-0.5 * ((t - c) / args.burst_width) ** 2) for c in centers)
+        return args.base_rate + (args.peak_rate - args.base_rate) * peak
+    raise ValueError(f"Unknown curve: {curve}")
+
+
+def mint_jwt(secret, subject, role, ttl_seconds=3600):
+    """Signs an HS256 JWT like the ones Supabase Auth issues, for ``subject`` acting as ``role``."""
+    def encode(part):
+        raw = json.dumps(part, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+    now = int(time.time())
+    claims = {"role": role, "iat": now, "exp": now + ttl_seconds}
+    if subject:
+        claims.update({"sub": subject, "aud": "authenticated"})
+    signing_input = f"{encode({'alg': 'HS256', 'typ': 'JWT'})}.{encode(claims)}"
+    signature = hmac.new(secret.encode(), signing_input.encode(), hashlib.sha256).digest()
+    return f"{signing_input}.{base64.urlsafe_b64encode(signature).rstrip(b'=').decode()}"
+
+
+class Credentials:
+    """Authorization headers for setup/cleanup requests and for each employee's inserts."""
+
+    def __init__(self, args):
+        self.args = args
+        self.employee_tokens = {}
+        if args.auth == "jwt":
+            if not args.jwt_secret:
+                raise SystemExit("--auth jwt requires --jwt-secret (or $SUPABASE_JWT_SECRET).")
+            # Listing employees and deleting the run's rows are setup work, not measured.
+            self.admin_token = mint_jwt(args.jwt_secret, None, "service_role")
+        else:
+            self.admin_token = args.key
+
+    def admin_headers(self):
+        return {"Authorization": f"Bearer {self.admin_token}"}
+
+    def insert_headers(self, employee_id):
+        if self.args.auth == "key":
+            return {"Authorization": f"Bearer {self.args.key}"}
+        if employee_id not in self.employee_tokens:
+            ttl = int(self.args.duration) + 3600
+            self.employee_tokens[employee_id] = mint_jwt(self.args.jwt_secret, employee_id, "authenticated", ttl)
+        return {"Authorization": f"Bearer {self.employee_tokens[employee_id]}"}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+async def fetch_employees(session, args, credentials):
+    url = f"{args.url}/employees"
+    params = {"select": "id,full_name,company_id", "limit": str(args.employees)}
+    if args.company_id:
+        params["company_id"] = f"eq.{args.company_id}"
+    async with session.get(url, params=params, headers=credentials.admin_headers()) as response:
+        response.raise_for_status()
+        employees = await response.json()
+    if not employees:
+        raise SystemExit("No employees found to clock in with.")
+    return employees
+
+
+class KioskFleet:
+    """Sends clock events, one in flight per kiosk, and records the outcome of each.
+
+    Employees are spread round-robin over the kiosks and always clock in at their own one,
+    so events for the same kiosk queue behind each other like people at a terminal.
+    """
+
+    def __init__(self, session, args, employees, run_marker, credentials, rng):
+        self.session = session
+        self.args = args
+        self.employees = employees
+        self.run_marker = run_marker
+        self.credentials = credentials
+        self.rng = rng
+        self.kiosks = [asyncio.Lock() for _ in range(args.kiosks)]
+        self.kiosk_of = {e["id"]: i % args.kiosks for i, e in enumerate(employees)}
+        # Alternate Entrada/Salida per employee so the data looks like real shifts.
+        self.next_action = {e["id"]: "Entrada" for e in employees}
+        self.latencies = []
+        self.queue_delays = []
+        self.kiosk_events = Counter()
+        self.kiosk_queue_delays = {}
+        self.statuses = Counter()
+        self.errors = Counter()
+
+    def next_entry(self):
+        """Picks the next clock event. Called in arrival order so ``--seed`` fixes the sequence."""
+        employee = self.rng.choice(self.employees)
+        action = self.next_action[employee["id"]]
+        self.next_action[employee["id"]] = "Salida" if action == "Entrada" else "Entrada"
+        return {
+            "employee_id": employee["id"],
+            "company_id": employee["company_id"],
+            "employee_name": employee["full_name"],
+            "client_name": self.run_marker,
+            "action": action,
+        }
+
+    async def clock(self, entry, scheduled_at):
+        headers = {"Prefer": "return=minimal", **self.credentials.insert_headers(entry["employee_id"])}
+        kiosk = self.kiosk_of[entry["employee_id"]]
+        async with self.kiosks[kiosk]:
+            started = time.perf_counter()
+            self.queue_delays.append(started - scheduled_at)
+            self.kiosk_events[kiosk] += 1
+            self.kiosk_queue_delays[kiosk] = max(self.kiosk_queue_delays.get(kiosk, 0.0), started - scheduled_at)
+            try:
+                async with self.session.post(
+                    f"{self.args.url}/time_entries",
+                    json=entry,
+                    headers=headers,
+                ) as response:
+                    await response.read()
+                    self.statuses[response.status] += 1
+                    if response.status >= 400:
+                        self.errors[f"http_{response.status}"] += 1
+                    else:
+                        self.latencies.append(time.perf_counter() - started)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.errors[type(e).__name__] += 1
+
+
+async def run_load(args):
+    headers = {"apikey": args.key}
+    credentials = Credentials(args)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    connector = aiohttp.TCPConnector(limit=args.kiosks)
+    run_marker = f"{RUN_MARKER_PREFIX}{uuid.uuid4().hex[:8]}"
+
+    async with aiohttp.ClientSession(headers=headers, timeout=timeout, connector=connector) as session:
+        employees = await fetch_employees(session, args, credentials)
+        rng = random.Random(args.seed)
+        fleet = KioskFleet(session, args, employees, run_marker, credentials, rng)
+
+        # Non-homogeneous Poisson arrivals generated by thinning against the peak rate.
+        max_rate = max(args.peak_rate, args.base_rate)
+        tasks = []
+        run_start = time.perf_counter()
+        t = 0.0
+        while True:
+            t += rng.expovariate(max_rate)
+            if t >= args.duration:
+                break
+            if rng.random() > arrival_rate(args.curve, t, args) / max_rate:
+                continue
+            delay = run_start + t - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(fleet.clock(fleet.next_entry(), run_start + t)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - run_start
+
+        if args.cleanup:
+            async with session.delete(
+                f"{args.url}/time_entries",
+                params={"client_name": f"eq.{run_marker}"},
+                headers=credentials.admin_headers(),
+            ) as response:
+                if response.status >= 400:
+                    print(f"Cleanup failed with HTTP {response.status}", file=sys.stderr)
+
+    return build_report(args, fleet, run_marker, len(tasks), elapsed)
+
+
+def build_report(args, fleet, run_marker, sent, elapsed):
+    latencies_ms = sorted(latency * 1000 for latency in fleet.latencies)
+    queue_delays_ms = sorted(delay * 1000 for delay in fleet.queue_delays)
+    failed = sum(fleet.errors.values())
+
+    # The kiosks where people waited longest, to spot hot terminals in a burst.
+    busiest = sorted(fleet.kiosk_queue_delays.items(), key=lambda item: item[1], reverse=True)[:5]
+
+    def summarize(values):
+        return {
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+            "max": values[-1] if values else None,
+        }
+
+    return {
+        "run_marker": run_marker,
+        "config": {
+            "url": args.url,
+            "auth_mode": args.auth,
+            "seed": args.seed,
+            "kiosks": args.kiosks,
+            "curve": args.curve,
+            "base_rate": args.base_rate,
+            "peak_rate": args.peak_rate,
+            "duration_s": args.duration,
+            "bursts": args.bursts,
+            "burst_width_s": args.burst_width,
+        },
+        "requests": sent,
+        "succeeded": len(fleet.latencies),
+        "failed": failed,
+        "error_rate": failed / sent if sent else 0.0,
+        "elapsed_s": elapsed,
+        "throughput_rps": len(fleet.latencies) / elapsed if elapsed else 0.0,
+        "insert_latency_ms": summarize(latencies_ms),
+        "kiosk_queue_delay_ms": summarize(queue_delays_ms),
+        "kiosks_used": len(fleet.kiosk_events),
+        "events_per_kiosk": {
+            "min": min(fleet.kiosk_events.values(), default=0),
+            "max": max(fleet.kiosk_events.values(), default=0),
+        },
+        "slowest_kiosks": [
+            {"kiosk": kiosk, "events": fleet.kiosk_events[kiosk], "max_queue_delay_ms": delay * 1000}
+            for kiosk, delay in busiest
+        ],
+        "status_codes": {str(code): count for code, count in sorted(fleet.statuses.items())},
+        "errors": dict(fleet.errors),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate kiosk clock-in bursts against PostgREST.")
+    parser.add_argument("--url", default=os.environ.get("POSTGREST_URL", "http://localhost:54321/rest/v1"),
+                        help="PostgREST base URL (default: $POSTGREST_URL or local Supabase).")
+    parser.add_argument("--key", default=os.environ.get("SUPABASE_ANON_KEY", ""),
+                        help="API key sent as the apikey header (default: $SUPABASE_ANON_KEY). "
+                             "With --auth key it is also the bearer token for every request.")
+    parser.add_argument("--auth", choices=["jwt", "key"], default="jwt",
+                        help="jwt: sign each insert as the employee clocking in, so RLS applies (default). "
+                             "key: send --key as the bearer token for everything.")
+    parser.add_argument("--jwt-secret", default=os.environ.get("SUPABASE_JWT_SECRET", ""),
+                        help="Secret used to mint employee JWTs in jwt mode (default: $SUPABASE_JWT_SECRET).")
+    parser.add_argument("--company-id", type=int, help="Only clock employees of this company.")
+    parser.add_argument("--employees", type=int, default=1000, help="Maximum number of employees to use.")
+    parser.add_argument("--kiosks", type=int, default=200,
+                        help="Number of simulated kiosks. Each sends one insert at a time for its employees.")
+    parser.add_argument("--curve", choices=["constant", "ramp", "burst"], default="burst",
+                        help="Arrival curve of clock events over the run.")
+    parser.add_argument("--base-rate", type=float, default=5.0, help="Clock events per second outside bursts.")
+    parser.add_argument("--peak-rate", type=float, default=200.0, help="Clock events per second at the peak.")
+    parser.add_argument("--duration", type=float, default=60.0, help="Run length in seconds.")
+    parser.add_argument("--bursts", type=int, default=2, help="Number of shift-change bursts (burst curve).")
+    parser.add_argument("--burst-width", type=float, default=5.0, help="Standard deviation of a burst in seconds.")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds.")
+    parser.add_argument("--seed", type=int, help="Seed for reproducible arrival times.")
+    parser.add_argument("--output", help="Also write the JSON report to this file.")
+    parser.add_argument("--cleanup", action="store_true", help="Delete the rows inserted by this run afterwards.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = asyncio.run(run_load(args))
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
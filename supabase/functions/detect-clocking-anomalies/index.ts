@@ -0,0 +1,60 @@
+import { serve } from 'https://deno.land/std@0.177.0/http/server.ts'
+import { createClient } from 'https://esm.sh/@supabase/supabase-js@2'
+import { corsHeaders } from '../_shared/cors.ts'
+
+console.log(`Function "detect-clocking-anomalies" up and running!`)
+
+// Returns yesterday's date as YYYY-MM-DD in the given timezone, the same one the RPC uses
+// to read p_day; the UTC date is still the previous day just after midnight in Madrid.
+const getYesterday = (timeZone: string) => {
+  const today = new Intl.DateTimeFormat('en-CA', { timeZone }).format(new Date())
+  const yesterday = new Date(`${today}T00:00:00Z`)
+  yesterday.setUTCDate(yesterday.getUTCDate() - 1)
+  return yesterday.toISOString().split('T')[0]
+}
+
+serve(async (req) => {
+  // Handle CORS preflight requests
+  if (req.method === 'OPTIONS') {
+    return new Response('ok', { headers: corsHeaders })
+  }
+
+  try {
+    const serviceRoleKey = Deno.env.get('SUPABASE_SERVICE_ROLE_KEY') ?? ''
+
+    // The scan writes incidents for every company, so only the scheduler may trigger it.
+    const token = req.headers.get('Authorization')?.replace('Bearer ', '')
+    if (!token || token !== serviceRoleKey) {
+      return new Response(JSON.stringify({ error: 'Unauthorized' }), {
+        headers: { ...corsHeaders, 'Content-Type': 'application/json' },
+        status: 401,
+      })
+    }
+
+    // An explicit date allows re-running a past day; by default the previous day is scanned.
+    const body = req.headers.get('content-type')?.includes('application/json') ? await req.json() : {}
+    const timezone = body.timezone ?? 'Europe/Madrid'
+    const day = body.date ?? getYesterday(timezone)
+
+    const supabaseAdmin = createClient(Deno.env.get('SUPABASE_URL') ?? '', serviceRoleKey)
+
+    const { data: created, error } = await supabaseAdmin.rpc('detect_clocking_anomalies', {
+      p_day: day,
+      p_timezone: timezone,
+    })
+
+    if (error) {
+      throw error
+    }
+
+    return new Response(JSON.stringify({ message: `Created ${created} incidents for ${day}`, day, created }), {
+      headers: { ...corsHeaders, 'Content-Type': 'application/json' },
+      status: 200,
+    })
+  } catch (error) {
+    return new Response(JSON.stringify({ error: error.message }), {
+      headers: { ...corsHeaders, 'Content-Type': 'application/json' },
+      status: 400,
+    })
+  }
+})